@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 import tempfile
 from dotenv import load_dotenv
 
@@ -151,6 +152,15 @@ DATABASES = {
 }
 
 
+# Authentication
+# ModelBackend that also loads request.user.profile in the same query.
+# The stock ModelBackend stays listed so sessions created before the switch
+# (which store its path) keep authenticating.
+AUTHENTICATION_BACKENDS = [
+    "note2webapp.backends.ProfileModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -169,6 +179,23 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# The test suite creates and logs in users constantly; PBKDF2 dominates its
+# runtime, so use the cheap MD5 hasher when running `manage.py test`.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+if TESTING:
+    PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+    class _DisableMigrations:
+        """Create test tables straight from the models instead of migrating."""
+
+        def __contains__(self, item):
+            return True
+
+        def __getitem__(self, item):
+            return None
+
+    MIGRATION_MODULES = _DisableMigrations()
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -193,6 +220,29 @@ STATIC_URL = "/static/"
 MEDIA_ROOT = os.path.join(PROJECT_ROOT, "media")
 MEDIA_URL = "/media/"
 
+# Run upload validation on a background thread pool instead of inside the
+# request (the version shows as PENDING until it finishes)
+VALIDATE_IN_BACKGROUND = (
+    os.environ.get("VALIDATE_IN_BACKGROUND", "False").lower() == "true"
+)
+VALIDATION_WORKERS = int(os.environ.get("VALIDATION_WORKERS", "2"))
+
+# how many loaded .pt models each process keeps in memory for the test page
+# and validation (0 disables the cache)
+MODEL_CACHE_SIZE = int(os.environ.get("MODEL_CACHE_SIZE", "4"))
+
+# test-page predictions share one runner per process; when it's taken they
+# answer 503 after waiting at most this many seconds. Under daphne every sync
+# view runs on one shared thread, so waiting here stalls all of them: keep it
+# at 0 (don't wait) or a fraction of a second.
+INFERENCE_WAIT_SECONDS = float(os.environ.get("INFERENCE_WAIT_SECONDS", "0"))
+
+# large uploads are hashed while they're spooled to disk (duplicate detection)
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "note2webapp.upload_handlers.HashingTemporaryFileUploadHandler",
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
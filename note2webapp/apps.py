@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class Note2WebappConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "note2webapp"
+
+    def ready(self):
+        # pull in torch (via utils) and run one tiny op at startup so the first
+        # validation request doesn't pay for the import and lazy CPU init
+        import torch
+
+        from . import utils  # noqa: F401
+
+        torch.zeros(1).add_(1)
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.25 on 2026-10-15 22:51
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def _sha256_path(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def backfill_hashes(apps, schema_editor):
+    """
+    Versions uploaded before hashes were stored: hash their files once so
+    duplicate detection can rely on bundle_hash alone.
+    """
+    ModelVersion = apps.get_model("note2webapp", "ModelVersion")
+    pending = ModelVersion.objects.filter(
+        bundle_hash__isnull=True, is_deleted=False
+    ).only("id", "model_file", "predict_file", "schema_file")
+    for v in pending.iterator(chunk_size=200):
+        if not (v.model_file and v.predict_file and v.schema_file):
+            continue
+        try:
+            model_hash = _sha256_path(v.model_file.path)
+            predict_hash = _sha256_path(v.predict_file.path)
+            schema_hash = _sha256_path(v.schema_file.path)
+        except OSError:
+            # files are gone; nothing to compare against
+            continue
+        v.model_hash = model_hash
+        v.predict_hash = predict_hash
+        v.schema_hash = schema_hash
+        v.bundle_hash = hashlib.sha256(
+            f"{model_hash}:{predict_hash}:{schema_hash}".encode()
+        ).hexdigest()
+        v.save(
+            update_fields=["model_hash", "predict_hash", "schema_hash", "bundle_hash"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("note2webapp", "0016_rename_url_notification_verb_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="modelversion",
+            name="bundle_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+    ]
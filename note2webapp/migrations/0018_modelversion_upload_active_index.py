@@ -0,0 +1,19 @@
+# Generated by Django 4.2.25 on 2026-10-15 23:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("note2webapp", "0017_modelversion_bundle_hash_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="modelversion",
+            index=models.Index(
+                fields=["upload", "is_active"], name="mv_upload_active_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.25 on 2026-10-15 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("note2webapp", "0018_modelversion_upload_active_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="modelupload",
+            index=models.Index(
+                fields=["user", "-created_at"], name="mu_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="modelversion",
+            index=models.Index(
+                fields=["upload", "-created_at"], name="mv_upload_created_idx"
+            ),
+        ),
+    ]
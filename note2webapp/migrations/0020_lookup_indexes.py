@@ -0,0 +1,23 @@
+# Generated by Django 4.2.25 on 2026-10-15 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("note2webapp", "0019_created_at_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="modelupload",
+            index=models.Index(fields=["user", "name"], name="mu_user_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="modelversion",
+            index=models.Index(
+                fields=["upload", "is_deleted"], name="mv_upload_deleted_idx"
+            ),
+        ),
+    ]
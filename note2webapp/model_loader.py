@@ -1,8 +1,9 @@
-import importlib.util
-import json
 import os
 from django.conf import settings
 
+from .utils import load_schema_file
+from .utils import load_predict_module as _load_predict_file
+
 ALLOWED_CATEGORIES = {
     "sentiment",
     "recommendation",
@@ -19,14 +20,10 @@ def get_model_version_dir(category: str, model_name: str, version: str) -> str:
 def load_schema(category: str, model_name: str, version: str):
     model_dir = get_model_version_dir(category, model_name, version)
     schema_path = os.path.join(model_dir, "schema.json")
-    with open(schema_path, "r") as f:
-        return json.load(f)
+    return load_schema_file(schema_path)
 
 
 def load_predict_module(category: str, model_name: str, version: str):
     model_dir = get_model_version_dir(category, model_name, version)
     predict_path = os.path.join(model_dir, "predict.py")
-    spec = importlib.util.spec_from_file_location("predict_module", predict_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module, model_dir
+    return _load_predict_file(predict_path), model_dir
@@ -52,6 +52,14 @@ class ModelUpload(models.Model):
     name = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # the uploader dashboard lists a user's models newest first
+            models.Index(fields=["user", "-created_at"], name="mu_user_created_idx"),
+            # the create page rejects a name the user already has
+            models.Index(fields=["user", "name"], name="mu_user_name_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -113,10 +121,20 @@ class ModelVersion(models.Model):
     model_hash = models.CharField(max_length=64, blank=True, null=True)
     predict_hash = models.CharField(max_length=64, blank=True, null=True)
     schema_hash = models.CharField(max_length=64, blank=True, null=True)
-    bundle_hash = models.CharField(max_length=64, blank=True, null=True)
+    bundle_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # activate_version looks up a model's currently active version
+            models.Index(fields=["upload", "is_active"], name="mv_upload_active_idx"),
+            # detail and versions pages list a model's versions newest first
+            models.Index(
+                fields=["upload", "-created_at"], name="mv_upload_created_idx"
+            ),
+            # live-version counts on delete and the dashboard skip deleted rows
+            models.Index(fields=["upload", "is_deleted"], name="mv_upload_deleted_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         # assign next version number only on first save
@@ -33,7 +33,7 @@ class AdminStatsViewTests(TestCase):
 
     def test_staff_can_see_stats(self):
         self.client.login(username="admin", password="adminpass")
-        resp = self.client.get(reverse("admin_stats"))
+        resp = self.client.get(reverse("admin:admin_stats"))
         self.assertEqual(resp.status_code, 200)
         # a couple of key context vars
         self.assertIn("total_uploads", resp.context)
@@ -42,6 +42,6 @@ class AdminStatsViewTests(TestCase):
 
     def test_non_staff_redirected(self):
         self.client.login(username="u1", password="u1pass")
-        resp = self.client.get(reverse("admin_stats"))
+        resp = self.client.get(reverse("admin:admin_stats"))
         # staff_member_required -> 302 to admin login
         self.assertEqual(resp.status_code, 302)
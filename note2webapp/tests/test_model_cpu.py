@@ -4,9 +4,12 @@ from django.urls import reverse
 from django.contrib.auth import get_user_model
 from note2webapp.models import Profile, ModelUpload, ModelVersion
 import tempfile
+import threading
+import time
 from pathlib import Path
 from django.conf import settings
 from note2webapp import utils
+from unittest.mock import patch
 
 User = get_user_model()
 
@@ -61,6 +64,37 @@ class TestModelCPUView(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("result", response.context)
 
+    @patch("note2webapp.views.test_model_on_cpu_batch")
+    def test_post_list_runs_valid_items_as_one_batch(self, mock_batch):
+        mock_batch.return_value = [{"status": "ok", "output": 1}] * 2
+        self.client.login(username="uploader", password="pass123")
+        payload = [{"x": 1}, "not-an-object", {"x": 2}]
+        response = self.client.post(self.url, {"input_data": json.dumps(payload)})
+
+        mock_batch.assert_called_once_with(
+            response.context["version"], [{"x": 1}, {"x": 2}]
+        )
+        statuses = [o["status"] for o in response.context["result"]["outputs"]]
+        self.assertEqual(statuses, ["ok", "error", "ok"])
+
+    @patch("note2webapp.views.test_model_on_cpu")
+    def test_post_returns_503_when_runner_is_busy(self, mock_test):
+        mock_test.side_effect = utils.ModelRunnerBusy("busy")
+        self.client.login(username="uploader", password="pass123")
+        response = self.client.post(self.url, {"input_data": '{"x1": 1}'})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertEqual(response.context["parse_error"], "busy")
+        self.version.refresh_from_db()
+        self.assertEqual(self.version.usage_count, 0)
+
+    def test_post_increments_usage_count(self):
+        self.client.login(username="uploader", password="pass123")
+        for expected in (1, 2):
+            response = self.client.post(self.url, {"input_data": '{"x1": 1}'})
+            self.assertEqual(response.context["version"].usage_count, expected)
+
 
 @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class TestModelOnCpuExtraTests(TestCase):
@@ -113,3 +147,195 @@ class TestModelOnCpuExtraTests(TestCase):
         self._write_predict("# no predict defined")
         out = utils.test_model_on_cpu(self.version, {"a": 1})
         self.assertEqual(out["status"], "error")
+
+    def test_predict_module_is_cached_until_file_changes(self):
+        self._write_predict("def predict(data):\n    return {'v': 1}")
+        first = utils.load_predict_module(str(self.predict_path))
+        self.assertIs(utils.load_predict_module(str(self.predict_path)), first)
+
+        self._write_predict("def predict(data):\n    return {'v': 22}")
+        second = utils.load_predict_module(str(self.predict_path))
+        self.assertIsNot(second, first)
+        self.assertEqual(second.predict({}), {"v": 22})
+
+    def test_predict_module_cache_is_bounded(self):
+        paths = []
+        for i in range(utils._PREDICT_MODULE_CACHE_SIZE + 1):
+            path = self.tmpdir / f"predict_{i}.py"
+            path.write_text("def predict(data):\n    return {}")
+            paths.append(str(path))
+            utils.load_predict_module(str(path))
+        self.assertNotIn(paths[0], utils._PREDICT_MODULE_CACHE)
+        self.assertIn(paths[-1], utils._PREDICT_MODULE_CACHE)
+        self.assertLessEqual(
+            len(utils._PREDICT_MODULE_CACHE), utils._PREDICT_MODULE_CACHE_SIZE
+        )
+
+    def test_predict_module_cache_survives_concurrent_eviction(self):
+        paths = []
+        for i in range(4):
+            path = self.tmpdir / f"shared_{i}.py"
+            path.write_text("def predict(data):\n    return {}")
+            paths.append(str(path))
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(50):
+                    for path in paths:
+                        utils.load_predict_module(path)
+            except Exception as e:  # pragma: no cover - only on a race
+                errors.append(e)
+
+        with patch.object(utils, "_PREDICT_MODULE_CACHE_SIZE", 2):
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(utils._PREDICT_MODULE_CACHE), 2)
+
+    def test_torch_load_results_are_cached_per_file(self):
+        import torch
+
+        torch.save({"w": torch.ones(2)}, self.model_path)
+        utils.clear_model_cache()
+        first = utils._load_model_for_version(None, str(self.model_path))
+        self.assertIs(utils._load_model_for_version(None, str(self.model_path)), first)
+
+        utils.clear_model_cache(str(self.model_path))
+        self.assertIsNot(
+            utils._load_model_for_version(None, str(self.model_path)), first
+        )
+
+    @override_settings(MODEL_CACHE_SIZE=1)
+    def test_model_cache_size_comes_from_settings(self):
+        import torch
+
+        other_path = self.tmpdir / "other.pt"
+        torch.save({"w": torch.ones(1)}, self.model_path)
+        torch.save({"w": torch.zeros(1)}, other_path)
+        utils.clear_model_cache()
+        utils._torch_load_cached(str(self.model_path))
+        utils._torch_load_cached(str(other_path))
+        self.assertEqual([k[0] for k in utils._MODEL_CACHE], [str(other_path)])
+
+    def test_torch_load_falls_back_for_legacy_checkpoints(self):
+        import torch
+
+        torch.save(
+            {"w": torch.ones(2)}, self.model_path, _use_new_zipfile_serialization=False
+        )
+        utils.clear_model_cache()
+        obj = utils._torch_load_cached(str(self.model_path))
+        self.assertTrue(torch.equal(obj["w"], torch.ones(2)))
+
+    def test_batch_loads_predict_once_and_isolates_item_errors(self):
+        self._write_predict("def predict(data):\n    return {'x': 10 // data['x']}")
+        with patch.object(
+            utils, "load_predict_module", wraps=utils.load_predict_module
+        ) as load:
+            out = utils.test_model_on_cpu_batch(self.version, [{"x": 2}, {"x": 0}])
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual(out[0], {"status": "ok", "output": {"x": 5}})
+        self.assertEqual(out[1]["status"], "error")
+
+    def test_batch_reports_setup_errors_for_every_item(self):
+        self._write_predict("# no predict defined")
+        out = utils.test_model_on_cpu_batch(self.version, [{}, {}])
+        self.assertEqual([o["status"] for o in out], ["error", "error"])
+
+    @override_settings(INFERENCE_WAIT_SECONDS=0.01)
+    def test_batch_raises_busy_when_runner_is_held(self):
+        self._write_predict("def predict(data):\n    return {}")
+        held, release = threading.Event(), threading.Event()
+
+        def hold_runner():
+            with utils._working_dir(str(self.predict_path.parent)):
+                held.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold_runner)
+        holder.start()
+        held.wait()
+        try:
+            with self.assertRaises(utils.ModelRunnerBusy):
+                utils.test_model_on_cpu_batch(self.version, [{}])
+        finally:
+            release.set()
+            holder.join()
+
+    def test_view_answers_503_at_once_while_validation_holds_runner(self):
+        started, release = self.tmpdir / "started", self.tmpdir / "release"
+        # predict.py blocks at import, i.e. while validate_model holds the runner
+        self._write_predict(
+            "import os, time\n"
+            f"open({str(started)!r}, 'w').close()\n"
+            f"while not os.path.exists({str(release)!r}):\n"
+            "    time.sleep(0.01)\n"
+        )
+        self.version.save()
+        validator = threading.Thread(target=utils.validate_model, args=(self.version,))
+        self.client.force_login(self.user)
+
+        with patch.object(ModelVersion, "save"):
+            validator.start()
+            try:
+                for _ in range(500):
+                    if started.exists():
+                        break
+                    time.sleep(0.01)
+                begun = time.monotonic()
+                resp = self.client.post(
+                    reverse("test_model_cpu", args=[self.version.id]),
+                    {"input_data": "{}"},
+                )
+                elapsed = time.monotonic() - begun
+            finally:
+                release.touch()
+                validator.join(timeout=5)
+
+        self.assertEqual(resp.status_code, 503)
+        self.assertLess(elapsed, 1)
+
+    def test_cached_modules_are_put_in_eval_mode(self):
+        self._write_predict(
+            "import torch\n"
+            "def _load_model(path):\n"
+            "    return torch.nn.Dropout(0.5)\n"
+            "def predict(model, data):\n"
+            "    return {}"
+        )
+        utils.clear_model_cache()
+        module = utils.load_predict_module(str(self.predict_path))
+        model = utils._load_model_for_version(module, str(self.model_path))
+        self.assertFalse(model.training)
+
+    def test_test_model_on_cpu_runs_predict_in_inference_mode(self):
+        self._write_predict(
+            "import torch\n"
+            "def predict(data):\n"
+            "    return {'inference': torch.is_inference_mode_enabled()}"
+        )
+        out = utils.test_model_on_cpu(self.version, {})
+        self.assertEqual(out, {"status": "ok", "output": {"inference": True}})
+
+    def test_user_load_model_result_is_cached_per_file(self):
+        # "fake model" bytes make torch.load fail, so the user's loader is used
+        self._write_predict(
+            "calls = []\n"
+            "def _load_model(path):\n"
+            "    calls.append(path)\n"
+            "    return object()\n"
+            "def predict(model, data):\n"
+            "    return {}"
+        )
+        utils.clear_model_cache()
+        module = utils.load_predict_module(str(self.predict_path))
+        first = utils._load_model_for_version(module, str(self.model_path))
+        self.assertIs(
+            utils._load_model_for_version(module, str(self.model_path)), first
+        )
+        self.assertEqual(len(module.calls), 1)
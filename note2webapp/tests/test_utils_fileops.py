@@ -4,9 +4,15 @@ import hashlib
 from pathlib import Path
 from unittest.mock import patch
 from django.conf import settings
-from django.test import TestCase, override_settings
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+    UploadedFile,
+)
 
+from note2webapp import utils
 from note2webapp.utils import (
     sha256_uploaded_file,
     sha256_file_path,
@@ -57,6 +63,47 @@ class FileOpsTests(TestCase):
         self.assertEqual(digest1, digest2)
         self.assertEqual(digest1, hashlib.sha256(b"hello world").hexdigest())
 
+    def test_sha256_uploaded_file_hashes_temporary_upload_from_disk(self):
+        f = TemporaryUploadedFile("big.pt", "application/octet-stream", 11, None)
+        try:
+            f.write(b"hello world")
+            f.flush()
+            self.assertEqual(
+                sha256_uploaded_file(f), hashlib.sha256(b"hello world").hexdigest()
+            )
+        finally:
+            f.close()
+
+    def test_sha256_uploaded_file_streams_and_rewinds_other_files(self):
+        with tempfile.TemporaryFile() as raw:
+            raw.write(b"hello world")
+            f = UploadedFile(raw, name="stream.pt", size=11)
+            digest = sha256_uploaded_file(f)
+            self.assertEqual(f.tell(), 0)
+        self.assertEqual(digest, hashlib.sha256(b"hello world").hexdigest())
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_large_upload_is_hashed_while_spooled_to_disk(self):
+        captured = {}
+
+        def view(request):
+            f = request.FILES["model_file"]
+            captured["precomputed"] = f.content_sha256
+            with patch("note2webapp.utils.sha256_file_path") as from_disk:
+                captured["digest"] = sha256_uploaded_file(f)
+                captured["read_from_disk"] = from_disk.called
+            return HttpResponse()
+
+        request = RequestFactory().post(
+            "/", {"model_file": SimpleUploadedFile("m.pt", b"hello world")}
+        )
+        view(request)
+
+        expected = hashlib.sha256(b"hello world").hexdigest()
+        self.assertEqual(captured["precomputed"], expected)
+        self.assertEqual(captured["digest"], expected)
+        self.assertFalse(captured["read_from_disk"])
+
     # ---------------------------------------------------------------
     # materialize_version_to_media
     # ---------------------------------------------------------------
@@ -76,6 +123,21 @@ class FileOpsTests(TestCase):
         self.assertTrue((target_dir / "predict.py").exists())
         self.assertTrue((target_dir / "schema.json").exists())
 
+    def test_materialize_version_to_media_falls_back_to_copy(self):
+        """If hardlinking fails (e.g. across devices) files are still copied."""
+        with patch("os.link", side_effect=OSError("cross-device link")):
+            materialize_version_to_media(self.version)
+
+        target = Path(
+            settings.MEDIA_ROOT,
+            self.version.category,
+            self.upload.name,
+            f"v{self.version.version_number}",
+            "model.pt",
+        )
+        self.assertEqual(target.read_bytes(), b"torchmodel")
+        self.assertFalse(os.path.samefile(target, self.version.model_file.path))
+
     # ---------------------------------------------------------------
     # delete_version_files_and_dir
     # ---------------------------------------------------------------
@@ -99,6 +161,30 @@ class FileOpsTests(TestCase):
         # Materialized dir deleted
         self.assertFalse(version_dir.exists())
 
+    def test_delete_version_files_and_dir_forgets_cached_schema(self):
+        schema_path = self.version.schema_file.path
+        utils.generate_input_and_output_schema(schema_path)
+        self.assertIn(schema_path, utils._SCHEMA_CACHE)
+
+        delete_version_files_and_dir(self.version)
+
+        self.assertNotIn(schema_path, utils._SCHEMA_CACHE)
+
+    def test_delete_version_files_and_dir_in_background(self):
+        materialize_version_to_media(self.version)
+        version_dir = Path(
+            settings.MEDIA_ROOT,
+            self.version.category,
+            self.upload.name,
+            f"v{self.version.version_number}",
+        )
+
+        future = delete_version_files_and_dir(self.version, background=True)
+        future.result(timeout=5)
+
+        self.assertFalse(os.path.exists(self.version.model_file.path))
+        self.assertFalse(version_dir.exists())
+
     def test_delete_version_files_and_dir_handles_exceptions(self):
         """Should not crash even if os.remove raises."""
         with patch("os.remove", side_effect=OSError("permission denied")):
@@ -120,6 +206,58 @@ class FileOpsTests(TestCase):
         for cat in ["sentiment", "recommendation", "text-classification"]:
             self.assertFalse((base / cat / self.upload.name).exists())
 
+    def test_delete_model_media_tree_ignores_unsafe_names(self):
+        base = Path(settings.MEDIA_ROOT)
+        keep = [
+            base / "models" / "keep.pt",
+            base / "sentiment" / "other" / "keep.txt",
+        ]
+        for path in keep:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+
+        for name in (".", "..", "", "other/..", "../sentiment"):
+            with self.subTest(name=name):
+                delete_model_media_tree(ModelUpload(user=self.user, name=name))
+                for path in keep:
+                    self.assertTrue(path.exists(), path)
+
+    def test_delete_model_media_tree_in_background(self):
+        path = Path(settings.MEDIA_ROOT, "sentiment", self.upload.name)
+        path.mkdir(parents=True, exist_ok=True)
+
+        future = delete_model_media_tree(self.upload, background=True)
+        # gone from its path before the worker runs, so a same-named model
+        # created right away can't have its files removed
+        self.assertFalse(path.exists())
+        path.mkdir(parents=True)
+        future.result(timeout=5)
+
+        self.assertTrue(path.exists())
+        self.assertEqual(
+            [p.name for p in path.parent.iterdir() if p.name.startswith(".trash-")],
+            [],
+        )
+
+    def test_delete_model_media_tree_in_background_stays_in_category_dirs(self):
+        base = Path(settings.MEDIA_ROOT)
+        for shared in ("models", "predict", "schemas"):
+            (base / shared / "MyModel").mkdir(parents=True, exist_ok=True)
+        before = sorted(p.name for p in base.iterdir())
+
+        for name in (self.upload.name, "."):
+            future = delete_model_media_tree(
+                ModelUpload(user=self.user, name=name), background=True
+            )
+            future.result(timeout=5)
+
+        self.assertEqual(sorted(p.name for p in base.iterdir()), before)
+        for shared in ("models", "predict", "schemas"):
+            self.assertTrue((base / shared / "MyModel").is_dir())
+            self.assertFalse(
+                any(p.name.startswith(".trash-") for p in (base / shared).iterdir())
+            )
+
     def test_delete_model_media_tree_handles_exceptions(self):
         """If shutil.rmtree fails, it should swallow the exception."""
         with patch("shutil.rmtree", side_effect=OSError("no permission")):
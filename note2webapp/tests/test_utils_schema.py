@@ -1,9 +1,10 @@
 # note2webapp/tests/test_utils_schema.py
 from unittest.mock import patch
 from django.test import TestCase
-from note2webapp import utils
+from note2webapp import model_loader, utils
 from note2webapp.models import ModelUpload, ModelVersion, User
 import tempfile
+import threading
 import json
 from pathlib import Path
 
@@ -74,6 +75,7 @@ class UtilsSchemaTests(TestCase):
                 "flag": {"type": "boolean"},
                 "meta": {"type": "object"},
                 "items": {"type": "array"},
+                "nullable": {"type": ["string", "null"]},
                 "custom": "bad_type",  # not dict
             },
         }
@@ -85,6 +87,7 @@ class UtilsSchemaTests(TestCase):
         self.assertTrue(data["flag"])
         self.assertEqual(data["meta"], {})
         self.assertEqual(data["items"], [])
+        self.assertEqual(data["nullable"], "example")
         self.assertEqual(data["custom"], "example")
 
 
@@ -147,3 +150,75 @@ class UtilsSchemaExtraTests(TestCase):
         self.assertFalse(utils._is_seek_error({"error": "some other error"}))
         self.assertFalse(utils._is_seek_error({"wrongkey": "no attribute 'seek'"}))
         self.assertFalse(utils._is_seek_error("notadict"))
+
+    def test_generate_input_and_output_schema_cache_returns_fresh_copies(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            p = Path(tmp) / "schema.json"
+            p.write_text(json.dumps({"input": {"meta": "object"}, "output": {}}))
+
+            first, _ = utils.generate_input_and_output_schema(str(p))
+            first["meta"]["mutated"] = True
+            second, _ = utils.generate_input_and_output_schema(str(p))
+            self.assertEqual(second, {"meta": {}})
+
+            p.write_text(json.dumps({"input": {"text": "str"}, "output": {}}))
+            third, _ = utils.generate_input_and_output_schema(str(p))
+            self.assertEqual(third, {"text": "example"})
+
+    def test_load_schema_shares_utils_cache_and_returns_copies(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            version_dir = Path(tmp) / "sentiment" / "m" / "v1"
+            version_dir.mkdir(parents=True)
+            (version_dir / "schema.json").write_text(
+                json.dumps({"input": {"text": "str"}, "output": {}})
+            )
+            with self.settings(MEDIA_ROOT=tmp):
+                first = model_loader.load_schema("sentiment", "m", "v1")
+                first["input"]["mutated"] = True
+                second = model_loader.load_schema("sentiment", "m", "v1")
+
+            self.assertEqual(second, {"input": {"text": "str"}, "output": {}})
+            self.assertIn(str(version_dir / "schema.json"), utils._SCHEMA_CACHE)
+
+    def test_schema_cache_is_bounded(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            utils, "_SCHEMA_CACHE_SIZE", 2
+        ):
+            paths = []
+            for i in range(3):
+                p = Path(tmp) / f"schema{i}.json"
+                p.write_text(json.dumps({"input": {"x": "int"}, "output": {}}))
+                paths.append(str(p))
+                utils.generate_input_and_output_schema(str(p))
+
+            self.assertNotIn(paths[0], utils._SCHEMA_CACHE)
+            self.assertIn(paths[2], utils._SCHEMA_CACHE)
+
+    def test_schema_cache_survives_concurrent_eviction(self):
+        errors = []
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            utils, "_SCHEMA_CACHE_SIZE", 2
+        ):
+            paths = []
+            for i in range(4):
+                p = Path(tmp) / f"schema{i}.json"
+                p.write_text(json.dumps({"input": {"x": "int"}, "output": {}}))
+                paths.append(str(p))
+
+            def worker():
+                try:
+                    for _ in range(50):
+                        for path in paths:
+                            utils.generate_input_and_output_schema(path)
+                            utils.clear_schema_cache(path)
+                except Exception as e:  # pragma: no cover - only on a race
+                    errors.append(e)
+
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(utils._SCHEMA_CACHE), 2)
@@ -1,6 +1,9 @@
 # note2webapp/tests/test_validation_flow.py  (just the failing test)
+import importlib.util
 import tempfile
 import json
+from unittest import skipUnless
+from unittest.mock import patch
 from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
 from note2webapp.models import ModelUpload, ModelVersion
@@ -84,6 +87,58 @@ class ValidateModelExtraTests(TestCase):
         self.assertEqual(result.status, "PASS")
         self.assertIn("✅ Validation Successful", result.log)
 
+    def test_validate_model_truncates_large_output_in_log(self):
+        predict_path = Path(self.version.predict_file.path)
+        predict_path.write_text(
+            "def predict(x):\n    return {'prediction': 1.0, 'blob': 'x' * 50000}"
+        )
+        result = utils.validate_model(self.version)
+        self.assertEqual(result.status, "PASS")
+        self.assertIn("[truncated,", result.log)
+        self.assertLess(len(result.log), utils.LOG_OUTPUT_MAX_CHARS + 1000)
+
+    @skipUnless(importlib.util.find_spec("numpy"), "numpy not installed")
+    def test_validate_model_passes_with_numpy_scalar_output(self):
+        Path(self.version.predict_file.path).write_text(
+            "import numpy as np\n"
+            "def predict(x):\n"
+            "    return {'prediction': np.float64(0.5), 'extra': np.int64(2)}"
+        )
+        result = utils.validate_model(self.version)
+        self.assertEqual(result.status, "PASS", result.log)
+        self.assertIn('"prediction": 0.5', result.log)
+
+    def test_validate_model_passes_with_wide_int_output(self):
+        Path(self.version.predict_file.path).write_text(
+            "def predict(x):\n    return {'prediction': 1.0, 'big': 2 ** 70}"
+        )
+        result = utils.validate_model(self.version)
+        self.assertEqual(result.status, "PASS", result.log)
+        self.assertIn(str(2**70), result.log)
+
+    def test_validate_model_fails_on_wrong_output_type_or_missing_key(self):
+        predict_path = Path(self.version.predict_file.path)
+        cases = [
+            ("{'prediction': 'high'}", "Wrong type for 'prediction'"),
+            ("{'score': 1.0}", "Missing key in output: prediction"),
+        ]
+        for returned, message in cases:
+            with self.subTest(returned=returned):
+                predict_path.write_text(f"def predict(x):\n    return {returned}")
+                result = utils.validate_model(self.version)
+                self.assertEqual(result.status, "FAIL")
+                self.assertIn(message, result.log)
+
+    def test_validate_model_only_writes_status_and_log(self):
+        Path(self.version.predict_file.path).write_text(
+            "def predict(x):\n    return {'prediction': 1.0}"
+        )
+        ModelVersion.objects.filter(pk=self.version.pk).update(tag="renamed")
+        utils.validate_model(self.version)
+        self.version.refresh_from_db()
+        self.assertEqual(self.version.status, "PASS")
+        self.assertEqual(self.version.tag, "renamed")
+
     def test_validate_model_fails_on_missing_predict(self):
         predict_path = Path(self.version.predict_file.path)
         predict_path.write_text("# no predict defined")
@@ -103,6 +158,14 @@ class ValidateModelExtraTests(TestCase):
         predict_path.write_text(
             "def predict(x):\n    return {'error': \"no attribute 'seek'\"}"
         )
-        utils._load_model_for_version = lambda m, p: object()
-        result = utils.validate_model(self.version)
+        with patch.object(utils, "_load_model_for_version", lambda m, p: object()):
+            result = utils.validate_model(self.version)
         self.assertIn(result.status, ["PASS", "FAIL"])
+
+    def test_background_worker_validates_by_id(self):
+        with patch.object(utils, "validate_model") as validate:
+            utils._validate_version_by_id(self.version.id)
+        validate.assert_called_once_with(self.version)
+
+        # version deleted before the worker picked it up
+        self.assertIsNone(utils._validate_version_by_id(self.version.id + 1000))
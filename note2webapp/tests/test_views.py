@@ -1,32 +1,40 @@
 # note2webapp/tests/test_views.py
 
 from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.models import User
+from unittest import skipUnless
 from unittest.mock import patch
+import importlib.util
 import tempfile
 import json
 
+from note2webapp import views
+from note2webapp.backends import ProfileModelBackend
 from note2webapp.models import ModelUpload, ModelVersion, Profile
 
 
 @override_settings(MEDIA_ROOT=tempfile.gettempdir())
 class ViewsHighCoverageTests(TestCase):
-    def setUp(self):
-        self.client = Client()
-
+    @classmethod
+    def setUpTestData(cls):
         # uploader
-        self.uploader = User.objects.create_user("uploader", password="pass")
-        Profile.objects.filter(user=self.uploader).update(role="uploader")
+        cls.uploader = User.objects.create_user("uploader", password="pass")
+        Profile.objects.filter(user=cls.uploader).update(role="uploader")
 
         # reviewer
-        self.reviewer = User.objects.create_user("reviewer", password="pass")
-        Profile.objects.filter(user=self.reviewer).update(role="reviewer")
+        cls.reviewer = User.objects.create_user("reviewer", password="pass")
+        Profile.objects.filter(user=cls.reviewer).update(role="reviewer")
 
         # admin / superuser
-        self.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
-        Profile.objects.filter(user=self.admin).update(role="admin")
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        Profile.objects.filter(user=cls.admin).update(role="admin")
+
+    def setUp(self):
+        self.client = Client()
 
     # ---------------- AUTH ----------------
 
@@ -51,6 +59,27 @@ class ViewsHighCoverageTests(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, "note2webapp/reviewer.html")
 
+    def test_session_user_comes_with_profile(self):
+        user = ProfileModelBackend().get_user(self.uploader.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.profile.role, "uploader")
+
+    def test_login_uses_profile_backend_and_old_sessions_still_work(self):
+        self.client.post(reverse("login"), {"username": "uploader", "password": "pass"})
+        self.assertEqual(
+            self.client.session["_auth_user_backend"],
+            "note2webapp.backends.ProfileModelBackend",
+        )
+
+        # a session stored before the custom backend existed
+        old = Client()
+        old.force_login(
+            self.uploader, backend="django.contrib.auth.backends.ModelBackend"
+        )
+        resp = old.get(reverse("dashboard"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.wsgi_request.user, self.uploader)
+
     def test_login_as_admin_redirects_to_dashboard(self):
         resp = self.client.post(
             reverse("login"),
@@ -62,19 +91,129 @@ class ViewsHighCoverageTests(TestCase):
     # ---------------- DASHBOARD ROUTER ----------------
 
     def test_dashboard_for_uploader(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         resp = self.client.get(reverse("dashboard"))
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, "note2webapp/home.html")
 
+    def test_dashboard_list_annotates_active_version_counts(self):
+        upload = ModelUpload.objects.create(user=self.uploader, name="counted")
+        for status, deleted in [("PASS", False), ("PASS", True), ("FAIL", False)]:
+            ModelVersion.objects.create(
+                upload=upload,
+                tag=f"{status}-{deleted}",
+                status=status,
+                is_deleted=deleted,
+            )
+        self.client.force_login(self.uploader)
+        resp = self.client.get(reverse("dashboard"))
+        counts = {u.name: u.active_versions_count for u in resp.context["uploads"]}
+        self.assertEqual(counts["counted"], 1)
+
+    def test_model_versions_page_counts(self):
+        upload = ModelUpload.objects.create(user=self.uploader, name="versions-page")
+        rows = [
+            ("PASS", True, False),
+            ("PASS", False, False),
+            ("FAIL", False, False),
+            ("PASS", False, True),
+        ]
+        for i, (status, active, deleted) in enumerate(rows):
+            ModelVersion.objects.create(
+                upload=upload,
+                tag=f"v{i}",
+                status=status,
+                is_active=active,
+                is_deleted=deleted,
+            )
+        self.client.force_login(self.uploader)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("model_versions", args=[upload.id]))
+        self.assertEqual(resp.status_code, 200)
+        # counts come from the fetched rows, not a separate aggregate
+        self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+        for key, expected in [
+            ("total_count", 4),
+            ("active_count", 1),
+            ("available_count", 2),
+            ("failed_count", 1),
+            ("deleted_count", 1),
+        ]:
+            self.assertEqual(resp.context[key], expected, key)
+
+    def test_model_versions_page_skips_large_text_columns(self):
+        upload = ModelUpload.objects.create(user=self.uploader, name="deferred")
+        ModelVersion.objects.create(upload=upload, tag="v1", log="x" * 1000)
+        self.client.force_login(self.uploader)
+        resp = self.client.get(reverse("model_versions", args=[upload.id]))
+        version = resp.context["versions"][0]
+        self.assertTrue({"log", "information"} <= version.get_deferred_fields())
+
     def test_dashboard_for_reviewer(self):
-        self.client.login(username="reviewer", password="pass")
+        self.client.force_login(self.reviewer)
         resp = self.client.get(reverse("dashboard"))
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, "note2webapp/reviewer.html")
 
+    def test_reviewer_list_queries_do_not_grow_with_models(self):
+        def list_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(reverse("reviewer_dashboard") + "?page=list")
+            self.assertEqual(resp.status_code, 200)
+            return len(ctx.captured_queries), resp
+
+        self.client.force_login(self.reviewer)
+        for i in range(2):
+            upload = ModelUpload.objects.create(user=self.uploader, name=f"rv-{i}")
+            ModelVersion.objects.create(
+                upload=upload, tag="v1", status="PASS", is_active=True
+            )
+        baseline, _ = list_queries()
+
+        for i in range(2, 5):
+            upload = ModelUpload.objects.create(user=self.uploader, name=f"rv-{i}")
+            ModelVersion.objects.create(
+                upload=upload, tag="v1", status="PASS", is_active=True
+            )
+        queries, resp = list_queries()
+
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(resp.context["uploads"]), 5)
+
+    def test_reviewer_list_is_paginated(self):
+        for i in range(3):
+            upload = ModelUpload.objects.create(user=self.uploader, name=f"pg-{i}")
+            ModelVersion.objects.create(
+                upload=upload, tag="v1", status="PASS", is_active=True
+            )
+        self.client.force_login(self.reviewer)
+        url = reverse("reviewer_dashboard") + "?page=list&p={}"
+        with patch.object(views, "REVIEWER_PAGE_SIZE", 2):
+            first = self.client.get(url.format(1))
+            last = self.client.get(url.format(2))
+        self.assertEqual([u.name for u in first.context["uploads"]], ["pg-2", "pg-1"])
+        self.assertEqual([u.name for u in last.context["uploads"]], ["pg-0"])
+        self.assertContains(first, "Page 1 of 2")
+
+    def test_reviewer_detail_page(self):
+        upload = ModelUpload.objects.create(user=self.uploader, name="rv-detail")
+        idle = ModelUpload.objects.create(user=self.uploader, name="rv-idle")
+        active = ModelVersion.objects.create(
+            upload=upload, tag="v1", status="PASS", is_active=True
+        )
+        url = reverse("reviewer_dashboard") + "?page=detail&pk={}"
+        self.client.force_login(self.reviewer)
+
+        resp = self.client.get(url.format(upload.pk))
+        self.assertEqual(resp.context["upload"], upload)
+        self.assertEqual(resp.context["active_version"], active)
+        self.assertRedirects(
+            self.client.get(url.format(idle.pk)), "/reviewer/?page=list"
+        )
+        self.assertEqual(self.client.get(url.format(0)).status_code, 404)
+
     def test_dashboard_for_admin_is_accessible(self):
-        self.client.login(username="admin", password="pass")
+        self.client.force_login(self.admin)
         resp = self.client.get(reverse("dashboard"))
         self.assertIn(resp.status_code, (200, 302))
 
@@ -100,12 +239,17 @@ class ViewsHighCoverageTests(TestCase):
     # ---------------- UPLOADER DASHBOARD MODES ----------------
 
     def test_uploader_create_model_get(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         resp = self.client.get(reverse("dashboard") + "?page=create")
         self.assertEqual(resp.status_code, 200)
 
+    def test_uploader_create_page_does_not_list_uploads(self):
+        self.client.force_login(self.uploader)
+        resp = self.client.get(reverse("dashboard") + "?page=create")
+        self.assertNotIn("uploads", resp.context)
+
     def test_uploader_create_model_post(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         resp = self.client.post(
             reverse("dashboard") + "?page=create",
             {"name": "MyModel"},
@@ -115,7 +259,7 @@ class ViewsHighCoverageTests(TestCase):
         self.assertTrue(ModelUpload.objects.filter(name="MyModel").exists())
 
     def test_uploader_detail_page(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, _ = self._make_upload_and_version()
         resp = self.client.get(reverse("dashboard") + f"?page=detail&pk={upload.pk}")
         self.assertEqual(resp.status_code, 200)
@@ -123,7 +267,7 @@ class ViewsHighCoverageTests(TestCase):
 
     @patch("note2webapp.views.validate_model")
     def test_add_version_missing_files_shows_error(self, mock_validate):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, _ = self._make_upload_and_version()
         resp = self.client.post(
             reverse("dashboard") + f"?page=add_version&pk={upload.pk}",
@@ -142,7 +286,7 @@ class ViewsHighCoverageTests(TestCase):
         duplicate-hash check in the view passes, and mock VersionForm so
         the save path is guaranteed.
         """
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, _ = self._make_upload_and_version()
 
         # dummy form instance that always validates and saves
@@ -199,25 +343,40 @@ class ViewsHighCoverageTests(TestCase):
 
     @patch("note2webapp.views.delete_version_files_and_dir")
     def test_soft_delete_version_success(self, mock_delete):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_and_version()
         resp = self.client.post(reverse("delete_version", args=[v.id]), follow=True)
         self.assertEqual(resp.status_code, 200)
         v.refresh_from_db()
         self.assertTrue(v.is_deleted)
+        mock_delete.assert_called_once_with(v, background=True)
+
+    def test_soft_delete_active_version_blocked_only_by_live_siblings(self):
+        self.client.force_login(self.uploader)
+        upload, v = self._make_upload_and_version()
+        sibling = ModelVersion.objects.create(upload=upload, tag="v2", status="PASS")
+        url = reverse("delete_version", args=[v.id])
+        ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+        self.assertEqual(self.client.post(url, **ajax).status_code, 400)
+
+        sibling.is_deleted = True
+        sibling.save()
+        with patch("note2webapp.views.delete_version_files_and_dir"):
+            self.assertEqual(self.client.post(url, **ajax).status_code, 200)
 
     def test_soft_delete_version_permission_denied(self):
         other = User.objects.create_user("other", password="pass")
         Profile.objects.filter(user=other).update(role="uploader")
         upload, v = self._make_upload_and_version(user=self.uploader)
 
-        self.client.login(username="other", password="pass")
+        self.client.force_login(other)
         resp = self.client.post(reverse("delete_version", args=[v.id]))
         # view redirects with error instead of 403
         self.assertEqual(resp.status_code, 302)
 
     def test_activate_version_fails_on_deleted(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_and_version()
         v.is_deleted = True
         v.save()
@@ -225,18 +384,39 @@ class ViewsHighCoverageTests(TestCase):
         self.assertEqual(resp.status_code, 302)
 
     def test_deprecate_version_success(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_and_version()
-        resp = self.client.post(reverse("deprecate_version", args=[v.id]), follow=True)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(
+                reverse("deprecate_version", args=[v.id]), follow=True
+            )
         self.assertEqual(resp.status_code, 200)
         v.refresh_from_db()
         self.assertFalse(v.is_active)
+        # only the flag is written back, not the whole row
+        updates = [q["sql"] for q in ctx.captured_queries if "UPDATE" in q["sql"]]
+        self.assertTrue(updates)
+        self.assertNotIn("model_file", " ".join(updates))
+
+    def test_deprecate_version_permission_denied_json_and_redirect(self):
+        other = User.objects.create_user("other", password="pass")
+        upload, v = self._make_upload_and_version(user=self.uploader)
+        url = reverse("deprecate_version", args=[v.id])
+        self.client.force_login(other)
+
+        resp = self.client.post(url, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(resp.json(), {"success": False, "error": "Permission denied"})
+
+        resp = self.client.post(url, follow=True)
+        self.assertRedirects(resp, reverse("dashboard"), fetch_redirect_response=False)
+        self.assertContains(resp, "permission to deprecate this version")
 
     # ---------------- DELETE MODEL ----------------
 
     @patch("note2webapp.views.delete_model_media_tree")
     def test_delete_model_blocked_when_versions_exist(self, mock_del):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_and_version()
         resp = self.client.post(reverse("delete_model", args=[upload.id]), follow=True)
         self.assertEqual(resp.status_code, 200)
@@ -244,16 +424,25 @@ class ViewsHighCoverageTests(TestCase):
 
     @patch("note2webapp.views.delete_model_media_tree")
     def test_delete_model_success(self, mock_del):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload = ModelUpload.objects.create(user=self.uploader, name="empty")
         resp = self.client.post(reverse("delete_model", args=[upload.id]), follow=True)
         self.assertEqual(resp.status_code, 200)
         self.assertFalse(ModelUpload.objects.filter(id=upload.id).exists())
+        self.assertTrue(mock_del.call_args.kwargs["background"])
+
+    @patch("note2webapp.views.delete_model_media_tree")
+    def test_delete_model_ignores_deleted_versions(self, mock_del):
+        self.client.force_login(self.uploader)
+        upload = ModelUpload.objects.create(user=self.uploader, name="only-deleted")
+        ModelVersion.objects.create(upload=upload, tag="v1", is_deleted=True)
+        self.client.post(reverse("delete_model", args=[upload.id]))
+        self.assertFalse(ModelUpload.objects.filter(id=upload.id).exists())
 
     # ---------------- EDIT VERSION INFO ----------------
 
     def test_edit_version_information_get_and_post(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_and_version()
         resp = self.client.get(reverse("edit_version_information", args=[v.id]))
         self.assertEqual(resp.status_code, 200)
@@ -271,7 +460,7 @@ class ViewsHighCoverageTests(TestCase):
 
     @patch("note2webapp.views.test_model_on_cpu")
     def test_test_model_cpu_valid_json(self, mock_test):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_and_version()
         mock_test.return_value = {"ok": True}
         resp = self.client.post(
@@ -282,7 +471,7 @@ class ViewsHighCoverageTests(TestCase):
         self.assertContains(resp, "ok")
 
     def test_test_model_cpu_bad_json(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_and_version()
         resp = self.client.post(
             reverse("test_model_cpu", args=[v.id]),
@@ -295,7 +484,7 @@ class ViewsHighCoverageTests(TestCase):
 
     @patch("note2webapp.views.test_model_on_cpu")
     def test_run_model_by_version_id(self, mock_test):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_and_version()
         mock_test.return_value = {"hello": "world"}
         resp = self.client.post(
@@ -305,10 +494,31 @@ class ViewsHighCoverageTests(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertJSONEqual(resp.content, {"hello": "world"})
 
+    @skipUnless(importlib.util.find_spec("numpy"), "numpy not installed")
+    @patch("note2webapp.views.test_model_on_cpu")
+    def test_run_model_by_version_id_serializes_numpy_output(self, mock_test):
+        import numpy as np
+
+        self.client.force_login(self.uploader)
+        upload, v = self._make_upload_and_version()
+        mock_test.return_value = {"status": "ok", "output": {"p": np.array([1, 2])}}
+        resp = self.client.post(reverse("run_model_by_version_id", args=[v.id]))
+        self.assertEqual(resp["Content-Type"], "application/json")
+        self.assertJSONEqual(resp.content, {"status": "ok", "output": {"p": [1, 2]}})
+
+    @patch("note2webapp.views.test_model_on_cpu")
+    def test_run_model_by_version_id_serializes_wide_ints(self, mock_test):
+        self.client.force_login(self.uploader)
+        upload, v = self._make_upload_and_version()
+        mock_test.return_value = {"status": "ok", "output": 2**70}
+        resp = self.client.post(reverse("run_model_by_version_id", args=[v.id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertJSONEqual(resp.content, {"status": "ok", "output": 2**70})
+
     # ---------------- ADMIN STATS ----------------
 
     def test_admin_stats_view(self):
-        self.client.login(username="admin", password="pass")
-        resp = self.client.get(reverse("admin_stats"))
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse("admin:admin_stats"))
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, "note2webapp/admin_stats.html")
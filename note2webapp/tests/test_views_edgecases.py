@@ -1,11 +1,16 @@
+import hashlib
 import json
 from unittest.mock import patch, MagicMock
-from django.test import TestCase, Client, override_settings
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.models import Group
+from django.db import connection
+from note2webapp import views
 from note2webapp.models import ModelUpload, ModelVersion, Profile
+from note2webapp.utils import bundle_sha256, sha256_file_path
 
 
 @override_settings(MEDIA_ROOT="/tmp")
@@ -39,6 +44,19 @@ class ViewsEdgeCaseTests(TestCase):
         # View redirects to detail page instead of rendering error text
         self.assertRedirects(resp, f"/dashboard/?page=detail&pk={upload.pk}")
 
+    def test_add_version_retry_prefills_failed_version(self):
+        upload = ModelUpload.objects.create(user=self.user, name="m1")
+        failed = ModelVersion.objects.create(
+            upload=upload, tag="v1", category="recommendation", status="FAIL"
+        )
+        resp = self.client.get(
+            reverse("dashboard") + f"?page=add_version&pk={upload.pk}&retry={failed.pk}"
+        )
+        self.assertTrue(resp.context["retrying"])
+        self.assertEqual(
+            resp.context["form"].initial, {"tag": "v1", "category": "recommendation"}
+        )
+
     # --- reviewer add_feedback no comment ---
     def test_add_feedback_no_comment(self):
         upload = ModelUpload.objects.create(user=self.user, name="m1")
@@ -89,16 +107,18 @@ class ViewsEdgeCaseTests(TestCase):
         predict_file = SimpleUploadedFile("p.py", b"print(1)")
         schema_file = SimpleUploadedFile("s.json", b"{}")
 
-        resp = self.client.post(
-            reverse("generate_model_info"),
-            {
-                "model_file": model_file,
-                "predict_file": predict_file,
-                "schema_file": schema_file,
-            },
-        )
+        with self.assertLogs("note2webapp.views", "ERROR") as logs:
+            resp = self.client.post(
+                reverse("generate_model_info"),
+                {
+                    "model_file": model_file,
+                    "predict_file": predict_file,
+                    "schema_file": schema_file,
+                },
+            )
         self.assertEqual(resp.status_code, 500)
         self.assertIn(b"Network or server issue", resp.content)
+        self.assertIn("Error from OpenAI", logs.output[0])
 
     # --- model_comments_view flags ---
     def test_model_comments_view_flags(self):
@@ -110,7 +130,20 @@ class ViewsEdgeCaseTests(TestCase):
 
 @override_settings(MEDIA_ROOT="/tmp")
 class MoreEdgeCaseViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # patch OpenAI once for the whole class instead of per test
+        cls._openai_patcher = patch("note2webapp.views.OpenAI")
+        cls.MockOpenAI = cls._openai_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._openai_patcher.stop()
+        super().tearDownClass()
+
     def setUp(self):
+        self.MockOpenAI.reset_mock()
         self.client = Client()
         # uploader
         self.uploader = User.objects.create_user("bob", password="pass")
@@ -145,12 +178,12 @@ class MoreEdgeCaseViewsTests(TestCase):
         )
         return v
 
-    @patch("note2webapp.views.User.objects.create_user")
-    def test_signup_integrity_error(self, mock_create_user):
-        """Simulate IntegrityError on signup — should show conflict message."""
+    @patch("note2webapp.views.Profile.objects.get_or_create")
+    def test_signup_integrity_error(self, mock_get_or_create):
+        """Simulate IntegrityError on profile setup — should show conflict message."""
         from django.db.utils import IntegrityError
 
-        mock_create_user.side_effect = IntegrityError("duplicate key")
+        mock_get_or_create.side_effect = IntegrityError("duplicate key")
 
         resp = self.client.post(
             reverse("signup"),
@@ -178,12 +211,19 @@ class MoreEdgeCaseViewsTests(TestCase):
     def test_add_version_duplicate_hash(self, mock_validate):
         """Covers the 'duplicate model file' check — identical hashes trigger error."""
         upload, v = self._make_upload_and_version()
+        # hashes are stored at upload time; mirror that for the existing version
+        v.model_hash = sha256_file_path(v.model_file.path)
+        v.predict_hash = sha256_file_path(v.predict_file.path)
+        v.schema_hash = sha256_file_path(v.schema_file.path)
+        v.bundle_hash = bundle_sha256(v.model_hash, v.predict_hash, v.schema_hash)
+        v.save()
         mock_validate.return_value = True
         resp = self.client.post(
             reverse("dashboard") + f"?page=add_version&pk={upload.pk}",
             {
                 "tag": "v2",
                 "category": "sentiment",
+                "information": "info",
                 "model_file": SimpleUploadedFile("m.pt", b"abc"),  # identical content
                 "predict_file": SimpleUploadedFile("p.py", b"print(1)"),
                 "schema_file": SimpleUploadedFile("s.json", b"{}"),
@@ -193,6 +233,83 @@ class MoreEdgeCaseViewsTests(TestCase):
 
         self.assertEqual(resp.status_code, 200)
         self.assertTemplateUsed(resp, "note2webapp/home.html")
+        self.assertIn("duplicate_error", resp.context)
+        mock_validate.assert_not_called()
+
+    @patch("note2webapp.views.validate_model")
+    def test_add_version_ignores_other_users_identical_bundle(self, mock_validate):
+        other = User.objects.create_user("someone-else", password="pass")
+        other_upload = ModelUpload.objects.create(user=other, name="theirs")
+        files = (b"abc", b"print(1)", b"{}")
+        hashes = [hashlib.sha256(content).hexdigest() for content in files]
+        ModelVersion.objects.create(
+            upload=other_upload,
+            tag="v1",
+            status="PASS",
+            bundle_hash=bundle_sha256(*hashes),
+        )
+
+        upload = ModelUpload.objects.create(user=self.uploader, name="mine")
+        self.client.post(
+            reverse("dashboard") + f"?page=add_version&pk={upload.pk}",
+            {
+                "tag": "v1",
+                "category": "sentiment",
+                "information": "info",
+                "model_file": SimpleUploadedFile("m.pt", files[0]),
+                "predict_file": SimpleUploadedFile("p.py", files[1]),
+                "schema_file": SimpleUploadedFile("s.json", files[2]),
+            },
+        )
+        mock_validate.assert_called_once()
+
+    @override_settings(VALIDATE_IN_BACKGROUND=True)
+    @patch("note2webapp.views.validate_model_in_background")
+    @patch("note2webapp.views.validate_model")
+    def test_add_version_validates_in_background(self, mock_validate, mock_bg):
+        upload = ModelUpload.objects.create(user=self.uploader, name="bg")
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                reverse("dashboard") + f"?page=add_version&pk={upload.pk}",
+                {
+                    "tag": "v1",
+                    "category": "sentiment",
+                    "information": "info",
+                    "model_file": SimpleUploadedFile("m.pt", b"bg-model"),
+                    "predict_file": SimpleUploadedFile("p.py", b"print(2)"),
+                    "schema_file": SimpleUploadedFile("s.json", b"{}"),
+                },
+            )
+
+        version = upload.versions.get()
+        self.assertRedirects(
+            resp,
+            f"/dashboard/?page=detail&pk={upload.pk}",
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(version.status, "PENDING")
+        mock_bg.assert_called_once_with(version.id)
+        mock_validate.assert_not_called()
+
+    def test_detail_page_polls_pending_versions(self):
+        upload = ModelUpload.objects.create(user=self.uploader, name="polling")
+        pending = ModelVersion.objects.create(upload=upload, tag="v1")
+        done = ModelVersion.objects.create(upload=upload, tag="v2", status="PASS")
+        resp = self.client.get(reverse("dashboard") + f"?page=detail&pk={upload.pk}")
+        self.assertContains(resp, reverse("version_status", args=[pending.id]))
+        self.assertNotContains(resp, reverse("version_status", args=[done.id]))
+        # polling is bounded rather than running for as long as the page is open
+        self.assertContains(resp, "MAX_ATTEMPTS")
+
+    def test_version_status_endpoint_is_owner_only(self):
+        upload, v = self._make_upload_and_version()
+        resp = self.client.get(reverse("version_status", args=[v.id]))
+        self.assertJSONEqual(resp.content, {"id": v.id, "status": "PASS"})
+
+        User.objects.create_user("stranger", password="pass")
+        self.client.login(username="stranger", password="pass")
+        resp = self.client.get(reverse("version_status", args=[v.id]))
+        self.assertEqual(resp.status_code, 404)
 
     def test_reviewer_approve_version(self):
         """No explicit approve branch exists — reviewer_dashboard redirects to list."""
@@ -238,9 +355,8 @@ class MoreEdgeCaseViewsTests(TestCase):
         self.assertEqual(resp2.status_code, 200)
 
     @override_settings(OPENAI_API_KEY="dummy-key")
-    @patch("note2webapp.views.OpenAI")
-    def test_generate_model_info_existing_version_mode_a(self, mock_openai):
-        mock_client = mock_openai.return_value
+    def test_generate_model_info_existing_version_mode_a(self):
+        mock_client = self.MockOpenAI.return_value
         fake_resp = MagicMock()
         fake_resp.choices = [MagicMock(message=MagicMock(content='{"desc": "ok"}'))]
         mock_client.chat.completions.create.return_value = fake_resp
@@ -270,10 +386,9 @@ class MoreEdgeCaseViewsTests(TestCase):
         self.assertIn(resp2.status_code, [200, 302])
 
     @override_settings(OPENAI_API_KEY="dummy-key")
-    @patch("note2webapp.views.OpenAI")
-    def test_generate_model_info_invalid_json_fallback(self, mock_openai):
+    def test_generate_model_info_invalid_json_fallback(self):
         """Covers fallback path where OpenAI returns invalid JSON."""
-        mock_client = mock_openai.return_value
+        mock_client = self.MockOpenAI.return_value
         fake_resp = MagicMock()
         fake_resp.choices = [MagicMock(message=MagicMock(content="Not a JSON"))]
         mock_client.chat.completions.create.return_value = fake_resp
@@ -343,6 +458,7 @@ class ViewsAuthAndRoutingTests(TestCase):
             {"username": "existing", "password1": "abcdefgh", "password2": "abcdefgh"},
         )
         self.assertContains(resp, "Username already exists.")
+        self.assertEqual(User.objects.filter(username="existing").count(), 1)
 
     def test_signup_short_password(self):
         resp = self.client.post(
@@ -417,3 +533,40 @@ class ViewsAuthAndRoutingTests(TestCase):
         # should redirect for non-fail
         resp2 = self.client.get(reverse("validation_failed", args=[pass_version.id]))
         self.assertEqual(resp2.status_code, 302)
+
+
+class SignupGroupCacheTests(TransactionTestCase):
+    """Real commits, so the group pk gets remembered and foreign keys are checked."""
+
+    signup = {"password1": "abcdefgh", "password2": "abcdefgh"}
+
+    def setUp(self):
+        self.addCleanup(views._set_uploader_group_id, None)
+
+    def test_signup_remembers_uploader_group_pk(self):
+        self.client.post(reverse("signup"), {"username": "first", **self.signup})
+        group = Group.objects.get(name="ModelUploader")
+        self.assertEqual(views._UPLOADER_GROUP_ID, group.pk)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("signup"), {"username": "second", **self.signup})
+        self.assertFalse(
+            any('FROM "auth_group"' in q["sql"] for q in ctx.captured_queries)
+        )
+        self.assertEqual(group.user_set.count(), 2)
+
+    def test_signup_recovers_from_group_deleted_elsewhere(self):
+        self.client.post(reverse("signup"), {"username": "first", **self.signup})
+
+        # as if another process removed the group: no signals fire here
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM auth_user_groups")
+            cursor.execute("DELETE FROM auth_group WHERE name = 'ModelUploader'")
+
+        resp = self.client.post(
+            reverse("signup"), {"username": "second", **self.signup}
+        )
+        self.assertRedirects(resp, reverse("login"), fetch_redirect_response=False)
+        group = Group.objects.get(name="ModelUploader")
+        self.assertTrue(group.user_set.filter(username="second").exists())
+        self.assertEqual(views._UPLOADER_GROUP_ID, group.pk)
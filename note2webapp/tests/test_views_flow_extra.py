@@ -1,32 +1,64 @@
 # note2webapp/tests/test_views_flow_extra.py
+import inspect
+import os
+import shutil
 import tempfile
-from django.test import TestCase, Client, override_settings
+from unittest.mock import patch
+from django.test import (
+    TestCase,
+    SimpleTestCase,
+    Client,
+    RequestFactory,
+    override_settings,
+)
 from django.urls import reverse
 from django.contrib.auth.models import User
 
+from note2webapp import views
 from note2webapp.models import ModelUpload, ModelVersion, Profile
 
 
-@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class ViewsFlowExtraTests(TestCase):
-    def setUp(self):
-        self.client = Client()
-
+    @classmethod
+    def setUpClass(cls):
+        # one temp MEDIA_ROOT per class, removed again in tearDownClass
+        cls._media = tempfile.mkdtemp()
+        cls._media_override = override_settings(MEDIA_ROOT=cls._media)
+        cls._media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._media_override.disable()
+        shutil.rmtree(cls._media, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
         # uploader
-        self.uploader = User.objects.create_user("uploader", password="pass")
-        Profile.objects.filter(user=self.uploader).update(role="uploader")
+        cls.uploader = User.objects.create_user("uploader", password="pass")
+        Profile.objects.filter(user=cls.uploader).update(role="uploader")
 
         # reviewer
-        self.reviewer = User.objects.create_user("reviewer", password="pass")
-        Profile.objects.filter(user=self.reviewer).update(role="reviewer")
+        cls.reviewer = User.objects.create_user("reviewer", password="pass")
+        Profile.objects.filter(user=cls.reviewer).update(role="reviewer")
 
         # admin (superuser)
-        self.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
         # make sure admin has a profile too
-        Profile.objects.get_or_create(user=self.admin, defaults={"role": "admin"})
+        Profile.objects.get_or_create(user=cls.admin, defaults={"role": "admin"})
 
-    def _make_upload_with_version(self, owner=None):
-        owner = owner or self.uploader
+        # shared upload + version for tests that don't depend on fresh rows;
+        # anything they change is rolled back after each test
+        cls.shared_upload, cls.shared_version = cls._create_upload_with_version(
+            cls.uploader
+        )
+
+    def setUp(self):
+        self.client = Client()
+
+    @staticmethod
+    def _create_upload_with_version(owner):
         upload = ModelUpload.objects.create(user=owner, name="model-one")
         v = ModelVersion.objects.create(
             upload=upload,
@@ -40,33 +72,32 @@ class ViewsFlowExtraTests(TestCase):
         )
         return upload, v
 
-    # ---- dashboard routing ----
-    def test_dashboard_for_uploader(self):
-        logged_in = self.client.login(username="uploader", password="pass")
-        self.assertTrue(logged_in)
-        resp = self.client.get(reverse("dashboard"))
-        self.assertEqual(resp.status_code, 200)
-        self.assertTemplateUsed(resp, "note2webapp/home.html")
-
-    def test_dashboard_for_reviewer(self):
-        logged_in = self.client.login(username="reviewer", password="pass")
-        self.assertTrue(logged_in)
-        resp = self.client.get(reverse("dashboard"))
-        self.assertEqual(resp.status_code, 200)
-        self.assertTemplateUsed(resp, "note2webapp/reviewer.html")
+    def _make_upload_with_version(self, owner=None):
+        return self._create_upload_with_version(owner or self.uploader)
 
-    def test_dashboard_for_admin_falls_back(self):
+    # ---- dashboard routing ----
+    def test_dashboard_role_routing(self):
         """
-        Make sure an authenticated superuser can hit /dashboard/ without
-        getting kicked to login. We force_login to avoid auth backend quirks.
+        uploader -> home.html, reviewer -> reviewer.html, and an authenticated
+        superuser can hit /dashboard/ without getting kicked to login.
         """
-        self.client.force_login(self.admin)
-        resp = self.client.get(reverse("dashboard"), follow=True)
-        self.assertEqual(resp.status_code, 200)
+        cases = [
+            ("uploader", "note2webapp/home.html"),
+            ("reviewer", "note2webapp/reviewer.html"),
+            ("admin", None),
+        ]
+        for username, template in cases:
+            with self.subTest(username=username):
+                client = Client()
+                client.force_login(getattr(self, username))
+                resp = client.get(reverse("dashboard"), follow=True)
+                self.assertEqual(resp.status_code, 200)
+                if template:
+                    self.assertTemplateUsed(resp, template)
 
     # ---- create model (duplicate name) ----
     def test_create_model_duplicate_name_shows_error(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         # first create
         self.client.post(
             reverse("dashboard") + "?page=create",
@@ -82,8 +113,8 @@ class ViewsFlowExtraTests(TestCase):
 
     # ---- delete model with versions ----
     def test_cannot_delete_model_with_versions_message(self):
-        self.client.login(username="uploader", password="pass")
-        upload, v = self._make_upload_with_version()
+        self.client.force_login(self.uploader)
+        upload = self.shared_upload
         resp = self.client.post(reverse("delete_model", args=[upload.id]), follow=True)
         self.assertContains(
             resp,
@@ -92,7 +123,7 @@ class ViewsFlowExtraTests(TestCase):
 
     # ---- soft delete (ajax) ----
     def test_soft_delete_version_ajax(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_with_version()
         resp = self.client.post(
             reverse("delete_version", args=[v.id]),
@@ -112,7 +143,7 @@ class ViewsFlowExtraTests(TestCase):
 
     # ---- activate version: cannot activate deleted ----
     def test_activate_deleted_version_fails(self):
-        self.client.login(username="uploader", password="pass")
+        self.client.force_login(self.uploader)
         upload, v = self._make_upload_with_version()
         v.is_deleted = True
         v.save()
@@ -127,24 +158,58 @@ class ViewsFlowExtraTests(TestCase):
             {"success": False, "error": "Cannot activate a deleted version."},
         )
 
+    # ---- activate version: only one active per model ----
+    def test_activate_version_deactivates_the_others(self):
+        self.client.force_login(self.uploader)
+        upload, old = self._make_upload_with_version()
+        new = ModelVersion.objects.create(upload=upload, tag="v2", status="PASS")
+
+        resp = self.client.post(
+            reverse("activate_version", args=[new.id]),
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            dict(upload.versions.values_list("tag", "is_active")),
+            {"v1": False, "v2": True},
+        )
+
     # ---- deprecate version ----
     def test_deprecate_version_ok(self):
-        self.client.login(username="uploader", password="pass")
-        upload, v = self._make_upload_with_version()
+        self.client.force_login(self.uploader)
+        v = self.shared_version
         resp = self.client.post(reverse("deprecate_version", args=[v.id]))
         self.assertEqual(resp.status_code, 302)
         v.refresh_from_db()
         self.assertFalse(v.is_active)
 
+    # ---- run_model_by_version_id post only ----
+    def test_run_model_by_version_requires_post(self):
+        self.client.force_login(self.uploader)
+        v = self.shared_version
+        resp = self.client.get(reverse("run_model_by_version_id", args=[v.id]))
+        self.assertEqual(resp.status_code, 405)
+
+
+class ViewsFlowNoDBTests(SimpleTestCase):
+    """
+    Endpoints that reject the request before touching the ORM.
+    Called through RequestFactory with an unsaved user so no DB is needed.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User(username="uploader")
+
     # ---- run_model_from_path input validation ----
     def test_run_model_from_path_requires_post(self):
-        self.client.login(username="uploader", password="pass")
-        resp = self.client.get(reverse("run_model_from_path"))
+        request = self.factory.get(reverse("run_model_from_path"))
+        request.user = self.user
+        resp = views.run_model_from_path(request)
         self.assertEqual(resp.status_code, 405)
 
     def test_run_model_from_path_bad_json(self):
-        self.client.login(username="uploader", password="pass")
-        resp = self.client.post(
+        request = self.factory.post(
             reverse("run_model_from_path"),
             {
                 "model_path": "/tmp/model.pt",
@@ -152,12 +217,27 @@ class ViewsFlowExtraTests(TestCase):
                 "input_data": "{not-json",
             },
         )
+        request.user = self.user
+        resp = views.run_model_from_path(request)
         self.assertEqual(resp.status_code, 400)
         self.assertJSONEqual(resp.content, {"error": "Invalid JSON in input_data"})
 
-    # ---- run_model_by_version_id post only ----
-    def test_run_model_by_version_requires_post(self):
-        self.client.login(username="uploader", password="pass")
-        upload, v = self._make_upload_with_version()
-        resp = self.client.get(reverse("run_model_by_version_id", args=[v.id]))
-        self.assertEqual(resp.status_code, 405)
+    def test_run_model_from_path_inspects_predict_signature_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            predict_path = os.path.join(tmp, "predict.py")
+            with open(predict_path, "w") as f:
+                f.write("def predict(data):\n    return {'echo': data}")
+
+            with patch(
+                "note2webapp.utils.inspect.signature", wraps=inspect.signature
+            ) as sig:
+                for _ in range(3):
+                    request = self.factory.post(
+                        reverse("run_model_from_path"),
+                        {"predict_path": predict_path, "input_data": '{"a": 1}'},
+                    )
+                    request.user = self.user
+                    resp = views.run_model_from_path(request)
+                    self.assertJSONEqual(resp.content, {"output": {"echo": {"a": 1}}})
+
+            self.assertEqual(sig.call_count, 1)
@@ -1,5 +1,6 @@
 # note2webapp/tests/tests_utils.py
 import os
+import shutil
 import tempfile
 import hashlib
 
@@ -9,9 +10,21 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from note2webapp.utils import sha256_uploaded_file, sha256_file_path
 
 
-# use temp media just to be safe
-@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class UtilsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # use temp media just to be safe, and clean it up afterwards
+        cls._media = tempfile.mkdtemp()
+        cls._media_override = override_settings(MEDIA_ROOT=cls._media)
+        cls._media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._media_override.disable()
+        shutil.rmtree(cls._media, ignore_errors=True)
+
     def setUp(self):
         # this is the content we’ll hash in both tests
         self.content = b"hello-world"
@@ -0,0 +1,24 @@
+import hashlib
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Same as Django's TemporaryFileUploadHandler, but hashes the upload while
+    it is being written to disk. The hex digest is left on the file as
+    ``content_sha256`` so duplicate detection doesn't read the file again.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hasher = hashlib.sha256(usedforsecurity=False)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        f = super().file_complete(file_size)
+        f.content_sha256 = self._hasher.hexdigest()
+        return f
@@ -1,7 +1,37 @@
 # note2webapp/urls.py
-from django.urls import path
+from django.urls import include, path
 from . import views
 
+api_urlpatterns = [
+    path("run-model/", views.run_model_from_path, name="run_model_from_path"),
+    path(
+        "run-model/<int:version_id>/",
+        views.run_model_by_version_id,
+        name="run_model_by_version_id",
+    ),
+    path(
+        "version/<int:version_id>/status/",
+        views.version_status,
+        name="version_status",
+    ),
+    path(
+        "generate-model-info/",
+        views.generate_model_info,
+        name="generate_model_info",
+    ),
+    path(
+        "comment/<int:comment_id>/reaction/",
+        views.toggle_comment_reaction,
+        name="toggle_comment_reaction",
+    ),
+    path("notifications/", views.list_notifications, name="list_notifications"),
+    path(
+        "notifications/mark-all-read/",
+        views.mark_all_notifications_read,
+        name="mark_all_notifications_read",
+    ),
+]
+
 urlpatterns = [
     path("", views.login_view, name="root"),
     path("signup/", views.signup_view, name="signup"),
@@ -37,33 +67,11 @@ urlpatterns = [
         views.edit_version_information,
         name="edit_version_information",
     ),
-    # NEW API endpoints
-    path("api/run-model/", views.run_model_from_path, name="run_model_from_path"),
-    path(
-        "api/run-model/<int:version_id>/",
-        views.run_model_by_version_id,
-        name="run_model_by_version_id",
-    ),
-    path("admin/stats/", views.admin_stats, name="admin_stats"),
     path(
         "model/<int:version_id>/comments/",
         views.model_comments_view,
         name="model_comments",
     ),
-    path(
-        "api/generate-model-info/",
-        views.generate_model_info,
-        name="generate_model_info",
-    ),
-    path(
-        "api/comment/<int:comment_id>/reaction/",
-        views.toggle_comment_reaction,
-        name="toggle_comment_reaction",
-    ),
-    path("api/notifications/", views.list_notifications, name="list_notifications"),
-    path(
-        "api/notifications/mark-all-read/",
-        views.mark_all_notifications_read,
-        name="mark_all_notifications_read",
-    ),
+    # NEW API endpoints, grouped so /api/... resolves under a single prefix
+    path("api/", include(api_urlpatterns)),
 ]
@@ -1,30 +1,124 @@
 # note2webapp/utils.py
 import os
+import functools
 import json
 import shutil
 import hashlib
 import traceback
+import uuid
+from io import BytesIO
 import importlib.util
 import inspect
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
 
 import torch
 from django.conf import settings
+from django.db import connection
+
+from .models import ModelVersion
+
+
+def _json_default(obj):
+    # numpy scalars/arrays (and tensors) that predict() may return
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps_pretty(obj):
+    return json.dumps(obj, indent=2, default=_json_default)
+
+
+def _stdlib_dumps_compact(obj):
+    return json.dumps(obj, separators=(",", ":"), default=_json_default).encode()
+
+
+try:  # optional, faster JSON parser/serializer
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps_pretty(obj):
+        try:
+            return orjson.dumps(
+                obj,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_SERIALIZE_NUMPY,
+            ).decode()
+        except TypeError:
+            # e.g. ints wider than 64 bits, which the stdlib encoder accepts
+            return _stdlib_dumps_pretty(obj)
+
+    def dumps_json(obj):
+        """Compact JSON as bytes; numpy values in predict() output are allowed."""
+        try:
+            return orjson.dumps(
+                obj,
+                default=_json_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        except TypeError:
+            return _stdlib_dumps_compact(obj)
+
+except ImportError:  # pragma: no cover - depends on environment
+    _json_loads = json.loads
+    _json_dumps_pretty = _stdlib_dumps_pretty
+    dumps_json = _stdlib_dumps_compact
+
 
 # primitive types we can strictly validate for "custom" schemas
 TYPE_MAP = {"float": float, "int": int, "str": str, "bool": bool}
 
+# read size used when hashing files on disk (1 MiB)
+HASH_CHUNK_SIZE = 1 << 20
+
+# max characters of predict() output kept in version.log
+LOG_OUTPUT_MAX_CHARS = 4096
+
 
 # ---------------------------------------------------------------------
 # 1. HASHING + MATERIALIZING + DELETING DIRECTORIES
 # ---------------------------------------------------------------------
+def _content_hasher():
+    """
+    sha256 object for content-addressing (duplicate detection only).
+    These digests are not used for security, so let OpenSSL pick its
+    fastest implementation.
+    """
+    return hashlib.sha256(usedforsecurity=False)
+
+
 def sha256_uploaded_file(django_file):
     """
     Compute sha256 for an uploaded file (InMemory/Temporary) by streaming chunks.
     Used in views to detect duplicate uploads.
     """
-    h = hashlib.sha256()
-    for chunk in django_file.chunks():
+    # hashed on the way in by HashingTemporaryFileUploadHandler
+    digest = getattr(django_file, "content_sha256", None)
+    if isinstance(digest, str):
+        return digest
+
+    # big uploads are spooled to disk; hash that file directly
+    if hasattr(django_file, "temporary_file_path"):
+        return sha256_file_path(django_file.temporary_file_path())
+
+    # small uploads live in a BytesIO; hash its buffer in one call
+    if isinstance(getattr(django_file, "file", None), BytesIO):
+        h = _content_hasher()
+        h.update(django_file.file.getvalue())
+        return h.hexdigest()
+
+    h = _content_hasher()
+    for chunk in django_file.chunks(HASH_CHUNK_SIZE):
         h.update(chunk)
+    # leave the file rewound for the form/storage that saves it next
+    django_file.seek(0)
     return h.hexdigest()
 
 
@@ -32,109 +126,178 @@ def sha256_file_path(path):
     """
     Same as above but for an existing file on disk.
     """
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
+        # the read/update loop runs in C
+        return hashlib.file_digest(f, _content_hasher).hexdigest()
+
+
+def bundle_sha256(model_hash, predict_hash, schema_hash):
+    """
+    One digest for a model/predict/schema triple, stored as
+    ModelVersion.bundle_hash so duplicate uploads are a single lookup.
+    """
+    h = _content_hasher()
+    h.update(f"{model_hash}:{predict_hash}:{schema_hash}".encode())
     return h.hexdigest()
 
 
-def materialize_version_to_media(version):
+def _link_or_copy(src, dst):
     """
-    After a version PASSes validation, copy its files into:
-      media/<category>/<model-name>/v<version_number>/
-    with consistent filenames.
+    Hardlink src to dst (same filesystem, no data copied); fall back to a
+    real copy across devices or where links aren't supported.
     """
-    target_dir = os.path.join(
+    # drop any previous file first so we never write through an old link
+    try:
+        os.remove(dst)
+    except FileNotFoundError:
+        pass
+
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
+
+
+def _version_media_dir(version):
+    """media/<category>/<model-name>/v<version_number>/"""
+    return os.path.join(
         settings.MEDIA_ROOT,
         version.category,
         version.upload.name,
         f"v{version.version_number}",
     )
+
+
+def materialize_version_to_media(version):
+    """
+    After a version PASSes validation, copy its files into:
+      media/<category>/<model-name>/v<version_number>/
+    with consistent filenames.
+    """
+    target_dir = _version_media_dir(version)
     os.makedirs(target_dir, exist_ok=True)
 
-    # model.pt
-    if version.model_file and os.path.isfile(version.model_file.path):
-        shutil.copy(version.model_file.path, os.path.join(target_dir, "model.pt"))
+    for f, filename in (
+        (version.model_file, "model.pt"),
+        (version.predict_file, "predict.py"),
+        (version.schema_file, "schema.json"),
+    ):
+        if not f:
+            continue
+        try:
+            _link_or_copy(f.path, os.path.join(target_dir, filename))
+        except FileNotFoundError:
+            # uploaded file is gone; nothing to materialize
+            pass
 
-    # predict.py
-    if version.predict_file and os.path.isfile(version.predict_file.path):
-        shutil.copy(version.predict_file.path, os.path.join(target_dir, "predict.py"))
 
-    # schema.json
-    if version.schema_file and os.path.isfile(version.schema_file.path):
-        shutil.copy(version.schema_file.path, os.path.join(target_dir, "schema.json"))
+def _remove_version_paths(file_paths, version_dir):
+    for path in file_paths:
+        try:
+            os.remove(path)
+        except OSError:
+            # already gone / not removable: don't crash deletion
+            pass
+    try:
+        shutil.rmtree(version_dir)
+    except Exception:
+        # missing dir or permission problem: don't crash deletion
+        pass
 
 
-def delete_version_files_and_dir(version):
+def delete_version_files_and_dir(version, background=False):
     """
     Delete the uploaded files (the ones stored by FileField)
     AND the materialized media/<category>/<model-name>/vX/ folder for this version.
+    With background=True the removal runs on a worker thread and the Future
+    is returned; cached models and schemas for the files are dropped right
+    away either way.
     """
-    # 1) delete uploaded files
-    for f in [version.model_file, version.predict_file, version.schema_file]:
-        if f and getattr(f, "path", None):
-            try:
-                if os.path.isfile(f.path):
-                    os.remove(f.path)
-            except Exception:
-                # don't crash deletion
-                pass
-
-    # 2) delete materialized dir
-    version_dir = os.path.join(
-        settings.MEDIA_ROOT,
-        version.category,
-        version.upload.name,
-        f"v{version.version_number}",
-    )
-    if os.path.isdir(version_dir):
-        try:
-            shutil.rmtree(version_dir)
-        except Exception:
-            pass
+    file_paths = [
+        f.path
+        for f in (version.model_file, version.predict_file, version.schema_file)
+        if f and getattr(f, "path", None)
+    ]
+    for path in file_paths:
+        clear_model_cache(path)
+        clear_schema_cache(path)
+    version_dir = _version_media_dir(version)
+
+    if background:
+        return _background_executor("cleanup", 1).submit(
+            _remove_version_paths, file_paths, version_dir
+        )
+    _remove_version_paths(file_paths, version_dir)
 
 
-def delete_model_media_tree(model_upload):
+def delete_model_media_tree(model_upload, background=False):
     """
     Delete the whole dir for this model:
         media/<category>/<model-name>/
-    We try known categories and the category of any existing version.
+    Only the known category dirs are looked in.
+    With background=True the dirs are first renamed aside, then removed on
+    the cleanup worker; the Future is returned.
     """
-    # try to read category from an existing version
-    any_version = model_upload.versions.first()
-    possible_categories = []
-    if any_version:
-        possible_categories.append(any_version.category)
+    model_dirs = _model_media_dirs(model_upload.name)
+    if not background:
+        _remove_dirs(model_dirs)
+        return
+
+    # move the dirs out of the way now, so a model re-created under the same
+    # name can't lose its new files to the queued removal
+    doomed = []
+    for model_dir in model_dirs:
+        trash = os.path.join(os.path.dirname(model_dir), f".trash-{uuid.uuid4().hex}")
+        try:
+            os.rename(model_dir, trash)
+        except OSError:
+            _remove_dirs([model_dir])
+            continue
+        doomed.append(trash)
+    return _background_executor("cleanup", 1).submit(_remove_dirs, doomed)
+
+
+def _model_media_dirs(name):
+    # the name must be one plain path component: "", ".", ".." or "a/b"
+    # would resolve to the category dir itself or to shared media dirs
+    if name in ("", ".", "..") or os.path.basename(name) != name:
+        return []
+    dirs = []
+    for category, _ in ModelVersion.CATEGORY_CHOICES:
+        candidate = os.path.join(settings.MEDIA_ROOT, category, name)
+        if os.path.isdir(candidate):
+            dirs.append(candidate)
+    return dirs
 
-    # also try your 3 fixed categories
-    possible_categories.extend(["sentiment", "recommendation", "text-classification"])
 
-    for cat in possible_categories:
-        candidate = os.path.join(settings.MEDIA_ROOT, cat, model_upload.name)
-        if os.path.isdir(candidate):
-            try:
-                shutil.rmtree(candidate)
-            except Exception:
-                pass
+def _remove_dirs(paths):
+    for path in paths:
+        try:
+            shutil.rmtree(path)
+        except Exception:
+            pass
 
 
 # ---------------------------------------------------------------------
 # 2. SCHEMA BUILDERS
 # ---------------------------------------------------------------------
+# dummy values per schema type; "object"/"array" are built fresh per field
+# so generated inputs never share a mutable default
+_SIMPLE_TYPE_DEFAULTS = {"float": 1.0, "int": 42, "str": "example", "bool": True}
+_JSON_TYPE_DEFAULTS = {
+    "string": "example text",
+    "number": 1.0,
+    "integer": 1,
+    "boolean": True,
+}
+
+
 def _make_value_from_simple_type(typ: str):
     """Used for the old/custom schema style."""
-    if typ == "float":
-        return 1.0
-    if typ == "int":
-        return 42
-    if typ == "str":
-        return "example"
-    if typ == "bool":
-        return True
-    if typ == "object":
+    value = _SIMPLE_TYPE_DEFAULTS.get(typ)
+    if value is None and typ == "object":
         return {}
-    return None
+    return value
 
 
 def _build_from_custom_schema(schema: dict):
@@ -151,13 +314,10 @@ def _build_from_custom_schema(schema: dict):
         if isinstance(typ, str):
             dummy[key] = _make_value_from_simple_type(typ)
         elif isinstance(typ, dict):
-            nested = {}
-            for k2, t2 in typ.items():
-                if isinstance(t2, str):
-                    nested[k2] = _make_value_from_simple_type(t2)
-                else:
-                    nested[k2] = None
-            dummy[key] = nested
+            dummy[key] = {
+                k2: _make_value_from_simple_type(t2) if isinstance(t2, str) else None
+                for k2, t2 in typ.items()
+            }
         else:
             dummy[key] = None
     return dummy, schema.get("output", {})
@@ -189,32 +349,89 @@ def _build_from_json_schema(schema: dict):
             continue
 
         ptype = prop.get("type")
-        if ptype == "string":
-            data[name] = "example text"
-        elif ptype == "number":
-            data[name] = 1.0
-        elif ptype == "integer":
-            data[name] = 1
-        elif ptype == "boolean":
-            data[name] = True
-        elif ptype == "object":
+        if ptype == "object":
             data[name] = {}
         elif ptype == "array":
             data[name] = []
+        elif isinstance(ptype, str):
+            data[name] = _JSON_TYPE_DEFAULTS.get(ptype, "example")
         else:
+            # e.g. "type": ["string", "null"]
             data[name] = "example"
 
     return data, None
 
 
+# schema path -> [mtime_ns, size, parsed schema, (input_data, output_schema) or None]
+# Bounded like the predict module cache (least recently used dropped first)
+# and, like it, shared with the validation workers, hence the lock.
+_SCHEMA_CACHE = OrderedDict()
+_SCHEMA_CACHE_SIZE = 32
+_SCHEMA_CACHE_LOCK = threading.RLock()
+
+
+def clear_schema_cache(schema_path):
+    """
+    Forget the cached parse of one schema file.
+    """
+    with _SCHEMA_CACHE_LOCK:
+        _SCHEMA_CACHE.pop(schema_path, None)
+
+
+def _copy_json(obj):
+    """
+    Copy of parsed-JSON data. Only dicts/lists need copying; everything else
+    is an immutable scalar, so this is much cheaper than copy.deepcopy.
+    """
+    if isinstance(obj, dict):
+        return {k: _copy_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_json(v) for v in obj]
+    return obj
+
+
+def _schema_entry(schema_path: str):
+    # cache entry for schema_path, re-parsed only when the file changes;
+    # the objects in it are shared, so callers hand out _copy_json copies
+    st = os.stat(schema_path)
+    with _SCHEMA_CACHE_LOCK:
+        entry = _SCHEMA_CACHE.get(schema_path)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            _SCHEMA_CACHE.move_to_end(schema_path)
+            return entry
+
+    schema = _json_loads(Path(schema_path).read_bytes())
+    entry = [st.st_mtime_ns, st.st_size, schema, None]
+    with _SCHEMA_CACHE_LOCK:
+        _SCHEMA_CACHE[schema_path] = entry
+        _SCHEMA_CACHE.move_to_end(schema_path)
+        while len(_SCHEMA_CACHE) > _SCHEMA_CACHE_SIZE:
+            _SCHEMA_CACHE.popitem(last=False)
+    return entry
+
+
+def load_schema_file(schema_path: str):
+    """
+    Parsed contents of a schema.json, cached until the file changes.
+    """
+    return _copy_json(_schema_entry(schema_path)[2])
+
+
 def generate_input_and_output_schema(schema_path: str):
     """
     Decide which schema style we got and build an input dict from it.
     Returns (input_data: dict, output_schema: dict|None)
+    The result only depends on the file, so it is cached until the file changes.
     """
-    with open(schema_path, "r") as f:
-        schema = json.load(f)
+    entry = _schema_entry(schema_path)
+    if entry[3] is None:
+        entry[3] = _input_and_output_from_schema(entry[2])
+    # callers hand input_data to user code, so never share the cached dicts
+    input_data, output_schema = entry[3]
+    return _copy_json(input_data), _copy_json(output_schema)
+
 
+def _input_and_output_from_schema(schema: dict):
     # 1) wrapped format: { "input": {...}, "output": {...} }
     if "input" in schema:
         input_schema = schema["input"]
@@ -236,27 +453,144 @@ def generate_input_and_output_schema(schema_path: str):
 # ---------------------------------------------------------------------
 # 3. MODEL LOADING HELPERS
 # ---------------------------------------------------------------------
+# predict.py path -> (mtime_ns, size, module); re-exec only when the file changes.
+# Bounded (least recently used dropped first): run_model_from_path accepts any path.
+# Shared by request threads and the validation workers, hence the lock.
+_PREDICT_MODULE_CACHE = OrderedDict()
+_PREDICT_MODULE_CACHE_SIZE = 32
+_PREDICT_MODULE_CACHE_LOCK = threading.RLock()
+
+
+def load_predict_module(predict_path, module_name="predict_module"):
+    """
+    Import a user's predict.py, reusing the already-executed module if the
+    file on disk hasn't changed since the last call.
+    """
+    st = os.stat(predict_path)
+    with _PREDICT_MODULE_CACHE_LOCK:
+        cached = _PREDICT_MODULE_CACHE.get(predict_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _PREDICT_MODULE_CACHE.move_to_end(predict_path)
+            return cached[2]
+
+    # user code runs outside the lock
+    spec = importlib.util.spec_from_file_location(module_name, predict_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    with _PREDICT_MODULE_CACHE_LOCK:
+        _PREDICT_MODULE_CACHE[predict_path] = (st.st_mtime_ns, st.st_size, module)
+        _PREDICT_MODULE_CACHE.move_to_end(predict_path)
+        while len(_PREDICT_MODULE_CACHE) > _PREDICT_MODULE_CACHE_SIZE:
+            _PREDICT_MODULE_CACHE.popitem(last=False)
+    return module
+
+
+# (model_path, mtime_ns, size[, loader]) -> loaded model, least recently used first;
+# at most settings.MODEL_CACHE_SIZE entries, shared with the validation workers
+_MODEL_CACHE = OrderedDict()
+_MODEL_CACHE_LOCK = threading.RLock()
+
+
+def predict_num_params(module):
+    """
+    Number of parameters of module.predict, computed once per loaded module.
+    """
+    cached = getattr(module, "_note2web_predict_params", None)
+    if cached is not None and cached[0] is module.predict:
+        return cached[1]
+
+    n = len(inspect.signature(module.predict).parameters)
+    module._note2web_predict_params = (module.predict, n)
+    return n
+
+
+def clear_model_cache(model_path=None):
+    """
+    Forget cached models (all of them, or just for one file).
+    """
+    with _MODEL_CACHE_LOCK:
+        if model_path is None:
+            _MODEL_CACHE.clear()
+            return
+        for key in [k for k in _MODEL_CACHE if k[0] == model_path]:
+            del _MODEL_CACHE[key]
+
+
+def _cached_model(key):
+    with _MODEL_CACHE_LOCK:
+        obj = _MODEL_CACHE.get(key)
+        if obj is not None:
+            _MODEL_CACHE.move_to_end(key)
+        return obj
+
+
+def _remember_model(key, obj):
+    if isinstance(obj, torch.nn.Module):
+        # cached models only ever serve predictions: no dropout, frozen batchnorm
+        obj.eval()
+    with _MODEL_CACHE_LOCK:
+        clear_model_cache(key[0])  # drop entries for older copies of this file
+        _MODEL_CACHE[key] = obj
+        while len(_MODEL_CACHE) > max(settings.MODEL_CACHE_SIZE, 0):
+            _MODEL_CACHE.popitem(last=False)
+
+
+def _model_cache_key(model_path, *extra):
+    st = os.stat(model_path)
+    return (model_path, st.st_mtime_ns, st.st_size, *extra)
+
+
+def _torch_load_cached(model_path):
+    key = _model_cache_key(model_path)
+    obj = _cached_model(key)
+    if obj is not None:
+        return obj
+
+    try:
+        # map storages straight from the file instead of copying them into RAM;
+        # mmap needs a str path and the zip checkpoint format
+        obj = torch.load(
+            str(model_path), map_location="cpu", mmap=True, weights_only=True
+        )
+    except Exception:
+        # legacy (non-zip) checkpoints can't be mmapped
+        obj = torch.load(model_path, map_location="cpu")
+    _remember_model(key, obj)
+    return obj
+
+
 def _load_model_for_version(module, model_path):
     """
     Best-effort loader for validation.
-    1) try torch.load
-    2) try user's _load_model(...)
+    1) try torch.load (cached per file)
+    2) try user's _load_model(...) (cached per file + loader)
     """
     # 1) try torch.load
     try:
-        return torch.load(model_path, map_location="cpu")
+        return _torch_load_cached(model_path)
     except Exception:
         pass
 
-    # 2) try user's loader
-    if hasattr(module, "_load_model") and callable(module._load_model):
+    # 2) try user's loader; full pickled modules end up here since torch.load
+    #    refuses them with weights_only, so don't rebuild them on every call
+    loader = getattr(module, "_load_model", None)
+    if callable(loader):
         try:
-            sig = inspect.signature(module._load_model)
-            n = len(sig.parameters)
+            key = _model_cache_key(model_path, loader)
+            obj = _cached_model(key)
+            if obj is not None:
+                return obj
+
+            n = len(inspect.signature(loader).parameters)
             if n == 0:
-                return module._load_model()
+                obj = loader()
             elif n == 1:
-                return module._load_model(model_path)
+                obj = loader(model_path)
+            else:
+                return None
+            if obj is not None:
+                _remember_model(key, obj)
+            return obj
         except Exception:
             pass
 
@@ -267,16 +601,72 @@ def _is_seek_error(out):
     """
     Detect that PyTorch "dict has no attribute 'seek'" message.
     """
-    return (
-        isinstance(out, dict)
-        and "error" in out
-        and "no attribute 'seek'" in str(out["error"])
-    )
+    if not isinstance(out, dict):
+        return False
+    err = out.get("error")
+    if err is None:
+        return False
+    # only stringify non-str errors
+    return "no attribute 'seek'" in (err if isinstance(err, str) else str(err))
 
 
 # ---------------------------------------------------------------------
 # 4. VALIDATION
 # ---------------------------------------------------------------------
+# predict.py files may open paths relative to their own folder, so we run
+# them with the cwd set to the model dir. The cwd is process-global, so this
+# lock keeps concurrent validations/tests (threads) from stepping on each other.
+# Only user code runs under it; result checks, logging and file copies don't.
+_CWD_LOCK = threading.RLock()
+
+
+class ModelRunnerBusy(Exception):
+    """Another validation/test held the model runner for too long."""
+
+
+@contextmanager
+def _working_dir(path, timeout=-1):
+    # timeout (seconds) bounds the wait for the lock; 0 doesn't wait, -1 waits forever
+    if not _CWD_LOCK.acquire(timeout=timeout):
+        raise ModelRunnerBusy("The model runner is busy, please try again shortly.")
+    try:
+        original_cwd = os.getcwd()
+        os.chdir(path)
+        try:
+            yield
+        finally:
+            os.chdir(original_cwd)
+    finally:
+        _CWD_LOCK.release()
+
+
+@functools.lru_cache(maxsize=256)
+def _output_checker(schema_items):
+    """
+    Build (once per distinct output schema) a function that checks predict()
+    output against a simple {"key": "type"} schema.
+    """
+    checks = tuple((key, TYPE_MAP[typ], typ) for key, typ in schema_items)
+
+    def check(result):
+        for key, py_type, typ in checks:
+            if key not in result:
+                raise Exception(f"Missing key in output: {key}")
+            value = result[key]
+            if not isinstance(value, py_type):
+                raise Exception(
+                    f"Wrong type for '{key}': expected {typ}, got {type(value).__name__}"
+                )
+
+    return check
+
+
+def _truncate_for_log(text, limit=LOG_OUTPUT_MAX_CHARS):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}\n... [truncated, {len(text)} chars total]"
+
+
 def validate_model(version):
     """
     1. import version's predict.py
@@ -285,52 +675,51 @@ def validate_model(version):
     4. if PASS: materialize to media/<cat>/<model>/vX/
     5. if FAIL: store traceback
     """
-    original_cwd = os.getcwd()
     try:
         model_dir = os.path.dirname(version.model_file.path)
-        os.chdir(model_dir)
+        with _working_dir(model_dir):
+            # import predict.py
+            module = load_predict_module(version.predict_file.path, "predict")
 
-        # import predict.py
-        spec = importlib.util.spec_from_file_location(
-            "predict", version.predict_file.path
-        )
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        if not hasattr(module, "predict"):
-            raise Exception("predict() function missing in predict.py")
+            if not hasattr(module, "predict"):
+                raise Exception("predict() function missing in predict.py")
 
-        if not version.schema_file:
-            raise Exception("No schema file provided")
+            if not version.schema_file:
+                raise Exception("No schema file provided")
 
-        # build input from schema
-        input_data, output_schema = generate_input_and_output_schema(
-            version.schema_file.path
-        )
+            # build input from schema
+            input_data, output_schema = generate_input_and_output_schema(
+                version.schema_file.path
+            )
 
-        # inspect signature
-        sig = inspect.signature(module.predict)
-        num_params = len(sig.parameters)
+            # inspect signature
+            num_params = predict_num_params(module)
 
-        # call predict
-        if num_params == 1:
-            result = module.predict(input_data)
-        elif num_params == 2:
-            result = module.predict(version.model_file.path, input_data)
-        else:
-            raise Exception(f"predict() has {num_params} parameters, expected 1 or 2.")
-
-        # try to fix common torch.load seek error
-        if _is_seek_error(result):
-            try:
+            # forward-only: skip autograd bookkeeping
+            with torch.inference_mode():
+                # call predict
                 if num_params == 1:
-                    result = module.predict(version.model_file.path)
+                    result = module.predict(input_data)
                 elif num_params == 2:
-                    model_obj = _load_model_for_version(module, version.model_file.path)
-                    if model_obj is not None:
-                        result = module.predict(model_obj, input_data)
-            except Exception:
-                pass
+                    result = module.predict(version.model_file.path, input_data)
+                else:
+                    raise Exception(
+                        f"predict() has {num_params} parameters, expected 1 or 2."
+                    )
+
+                # try to fix common torch.load seek error
+                if _is_seek_error(result):
+                    try:
+                        if num_params == 1:
+                            result = module.predict(version.model_file.path)
+                        elif num_params == 2:
+                            model_obj = _load_model_for_version(
+                                module, version.model_file.path
+                            )
+                            if model_obj is not None:
+                                result = module.predict(model_obj, input_data)
+                    except Exception:
+                        pass
 
         if not isinstance(result, dict):
             raise Exception("predict() must return a dict")
@@ -348,13 +737,7 @@ def validate_model(version):
             )
         )
         if do_strict:
-            for key, typ in output_schema.items():
-                if key not in result:
-                    raise Exception(f"Missing key in output: {key}")
-                if not isinstance(result[key], TYPE_MAP[typ]):
-                    raise Exception(
-                        f"Wrong type for '{key}': expected {typ}, got {type(result[key]).__name__}"
-                    )
+            _output_checker(tuple(output_schema.items()))(result)
 
         # success
         version.status = "PASS"
@@ -362,9 +745,9 @@ def validate_model(version):
             "✅ Validation Successful\n\n"
             "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
             "INPUT (from schema):\n"
-            f"{json.dumps(input_data, indent=2)}\n\n"
+            f"{_json_dumps_pretty(input_data)}\n\n"
             "OUTPUT (from predict()):\n"
-            f"{json.dumps(result, indent=2)}\n"
+            f"{_truncate_for_log(_json_dumps_pretty(result))}\n"
             "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
         )
 
@@ -379,39 +762,69 @@ def validate_model(version):
             f"{traceback.format_exc()}\n"
             "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
         )
-    finally:
-        os.chdir(original_cwd)
 
-    version.save()
+    if version.pk:
+        # only these two columns change here
+        version.save(update_fields=["status", "log"])
+    else:
+        version.save()
     return version
 
 
-# ---------------------------------------------------------------------
-# 5. TEST MODEL ON CPU (manual testing from UI)
-# ---------------------------------------------------------------------
-def test_model_on_cpu(version, input_data):
-    """
-    Called from the test page.
-    Handles predict(input) and predict(model_path, input).
-    """
-    original_cwd = os.getcwd()
+def _validate_version_by_id(version_id):
     try:
-        model_dir = os.path.dirname(version.model_file.path)
-        os.chdir(model_dir)
+        version = ModelVersion.objects.select_related("upload").get(pk=version_id)
+    except ModelVersion.DoesNotExist:
+        # deleted before the worker got to it
+        return None
+    return validate_model(version)
+
+
+def _run_in_worker(fn, *args):
+    try:
+        return fn(*args)
+    finally:
+        # worker threads get their own DB connection; don't leak it
+        connection.close()
+
+
+# in-process thread pools by name, created on first use
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def _background_executor(name, max_workers):
+    with _EXECUTORS_LOCK:
+        if name not in _EXECUTORS:
+            _EXECUTORS[name] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=name
+            )
+        return _EXECUTORS[name]
+
 
-        predict_path = version.predict_file.path
-        model_path = version.model_file.path
+def validate_model_in_background(version_id):
+    """
+    Queue validate_model() for a version on a small in-process thread pool
+    so the upload request can return right away. The version stays PENDING
+    until the worker saves PASS/FAIL.
+    """
+    executor = _background_executor("validate", settings.VALIDATION_WORKERS)
+    return executor.submit(_run_in_worker, _validate_version_by_id, version_id)
 
-        spec = importlib.util.spec_from_file_location("predict_module", predict_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
 
-        if not hasattr(module, "predict"):
-            raise Exception("predict() function missing in predict.py")
+# ---------------------------------------------------------------------
+# 5. TEST MODEL ON CPU (manual testing from UI)
+# ---------------------------------------------------------------------
+def _error_result(exc):
+    return {"status": "error", "error": str(exc), "trace": traceback.format_exc()}
 
-        sig = inspect.signature(module.predict)
-        num_params = len(sig.parameters)
 
+def _predict_on_cpu(module, num_params, model_path, input_data):
+    """
+    One predict() call for the test page; handles predict(input) and
+    predict(model_path, input). Expects the caller to hold _working_dir.
+    """
+    try:
         if num_params == 1:
             output = module.predict(input_data)
         elif num_params == 2:
@@ -430,10 +843,44 @@ def test_model_on_cpu(version, input_data):
         return {"status": "ok", "output": output}
 
     except Exception as e:
-        return {
-            "status": "error",
-            "error": str(e),
-            "trace": traceback.format_exc(),
-        }
-    finally:
-        os.chdir(original_cwd)
+        return _error_result(e)
+
+
+def test_model_on_cpu_batch(version, inputs):
+    """
+    Run predict() on each of `inputs` for the test page and return one
+    result dict per input. predict.py is resolved and the working directory
+    switched once for the whole list rather than once per item.
+    Raises ModelRunnerBusy if the runner is taken (waiting at most
+    settings.INFERENCE_WAIT_SECONDS for it).
+    """
+    try:
+        model_dir = os.path.dirname(version.model_file.path)
+        with _working_dir(
+            model_dir, timeout=settings.INFERENCE_WAIT_SECONDS
+        ), torch.inference_mode():
+            model_path = version.model_file.path
+            module = load_predict_module(version.predict_file.path)
+
+            if not hasattr(module, "predict"):
+                raise Exception("predict() function missing in predict.py")
+
+            num_params = predict_num_params(module)
+            return [
+                _predict_on_cpu(module, num_params, model_path, input_data)
+                for input_data in inputs
+            ]
+
+    except ModelRunnerBusy:
+        raise
+    except Exception as e:
+        error = _error_result(e)
+        return [dict(error) for _ in inputs]
+
+
+def test_model_on_cpu(version, input_data):
+    """
+    Called from the test page.
+    Handles predict(input) and predict(model_path, input).
+    """
+    return test_model_on_cpu_batch(version, [input_data])[0]
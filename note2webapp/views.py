@@ -1,15 +1,15 @@
 import os
 import json
-import importlib
-import importlib.util
-import inspect
+import logging
+from functools import partial
 
 from django.contrib import messages
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import Group, User
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse
 from django.urls import reverse, NoReverseMatch
 from django.utils import timezone
 from django import forms
@@ -17,7 +17,7 @@ from django.db import transaction, IntegrityError, models
 
 # for admin stats
 from django.contrib.admin.views.decorators import staff_member_required
-from django.db.models import Count
+from django.db.models import BooleanField, Case, Count, Q, Value, When
 
 from django.conf import settings
 from django.views.decorators.http import require_POST
@@ -34,15 +34,95 @@ from .models import (
 )
 from .utils import (
     validate_model,
+    validate_model_in_background,
     test_model_on_cpu,
+    test_model_on_cpu_batch,
+    ModelRunnerBusy,
     sha256_uploaded_file,
-    sha256_file_path,
+    dumps_json,
+    bundle_sha256,
     delete_version_files_and_dir,
     delete_model_media_tree,
+    load_predict_module,
+    predict_num_params,
 )
 from .decorators import role_required
 from openai import OpenAI
 
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# HELPERS
+# ---------------------------------------------------------
+def _get_version(**lookup):
+    """
+    get_object_or_404 for a ModelVersion with its upload and the upload's
+    owner joined in, since nearly every caller checks version.upload.user.
+    """
+    return get_object_or_404(
+        ModelVersion.objects.select_related("upload__user"), **lookup
+    )
+
+
+# pk of the "ModelUploader" group every signup joins; None until looked up
+_UPLOADER_GROUP_ID = None
+
+
+def _uploader_group_id():
+    """
+    The group's pk, fetched (or created) on the first signup only. It is
+    remembered once that transaction commits, so a rolled-back create can't
+    leave a pk for a row that doesn't exist.
+    """
+    if _UPLOADER_GROUP_ID is not None:
+        return _UPLOADER_GROUP_ID
+    group, _ = Group.objects.get_or_create(name="ModelUploader")
+    transaction.on_commit(partial(_set_uploader_group_id, group.pk))
+    return group.pk
+
+
+def _set_uploader_group_id(pk):
+    global _UPLOADER_GROUP_ID
+    _UPLOADER_GROUP_ID = pk
+
+
+def _forget_uploader_group_id(pk):
+    """Drop the remembered pk if it is pk; True if it was."""
+    if pk is None or _UPLOADER_GROUP_ID != pk:
+        return False
+    _set_uploader_group_id(None)
+    return True
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    JsonResponse for the larger payloads (model outputs, notification lists),
+    encoded with orjson when it's installed.
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(dumps_json(data), **kwargs)
+
+
+def _is_ajax(request):
+    """True for fetch()/XHR calls from our pages, which expect JSON back."""
+    return request.META.get("HTTP_X_REQUESTED_WITH") == "XMLHttpRequest"
+
+
+def _fail(request, status, message, *redirect_to, ajax_message=None, **kwargs):
+    """
+    Error reply for the version/model actions: JSON for fetch() callers,
+    otherwise a flash message and a redirect to redirect_to.
+    """
+    if _is_ajax(request):
+        return JsonResponse(
+            {"success": False, "error": ajax_message or message}, status=status
+        )
+    messages.error(request, message)
+    return redirect(*redirect_to, **kwargs)
+
 
 # ---------------------------------------------------------
 # AUTH
@@ -58,8 +138,6 @@ def signup_view(request):
             errors.append("All fields are required.")
         if password1 and password2 and password1 != password2:
             errors.append("Passwords do not match.")
-        if User.objects.filter(username=username).exists():
-            errors.append("Username already exists.")
         if password1 and len(password1) < 8:
             errors.append("Password must be at least 8 characters long.")
 
@@ -68,26 +146,47 @@ def signup_view(request):
                 messages.error(request, e)
             return render(request, "note2webapp/login.html")
 
+        # a taken username is caught by the unique constraint below
+        user = None
         try:
-            with transaction.atomic():
-                user = User.objects.create_user(username=username, password=password1)
-
-                # If a signal already created Profile, this will just fetch it.
-                profile, created = Profile.objects.get_or_create(
-                    user=user, defaults={"role": "uploader"}
-                )
-                # Ensure normal signups end up as uploader (unless something else set it)
-                if profile.role != "uploader" and not user.is_superuser:
-                    profile.role = "uploader"
-                    profile.save(update_fields=["role"])
+            for attempt in range(2):
+                group_id = _uploader_group_id()
+                user = None
+                try:
+                    with transaction.atomic():
+                        user = User.objects.create_user(
+                            username=username, password=password1
+                        )
 
-                group, _ = Group.objects.get_or_create(name="ModelUploader")
-                user.groups.add(group)
+                        # If a signal already created Profile, this will just fetch it.
+                        profile, created = Profile.objects.get_or_create(
+                            user=user, defaults={"role": "uploader"}
+                        )
+                        # Ensure normal signups end up as uploader (unless something else set it)
+                        if profile.role != "uploader" and not user.is_superuser:
+                            profile.role = "uploader"
+                            profile.save(update_fields=["role"])
+
+                        user.groups.add(group_id)
+                    break
+                except IntegrityError:
+                    # another process may have deleted the group behind our
+                    # remembered pk; its foreign key fails at commit, so look
+                    # the group up again and retry once
+                    if (
+                        user is None
+                        or attempt
+                        or not _forget_uploader_group_id(group_id)
+                    ):
+                        raise
 
             messages.success(request, "Account created successfully! Please login.")
             return redirect("login")
 
         except IntegrityError:
+            if user is None:
+                messages.error(request, "Username already exists.")
+                return render(request, "note2webapp/login.html")
             # Handles any rare race (double post / parallel signal, etc.)
             messages.error(
                 request,
@@ -149,7 +248,7 @@ def dashboard(request):
     - reviewer: reviewer dashboard
     """
     if request.user.is_staff:
-        return redirect("admin_stats")
+        return redirect("admin:admin_stats")
 
     role = getattr(request.user.profile, "role", "uploader")
     if role == "uploader":
@@ -163,7 +262,7 @@ def dashboard(request):
 
 @login_required
 def validation_failed(request, version_id):
-    version = get_object_or_404(ModelVersion, id=version_id, upload__user=request.user)
+    version = _get_version(id=version_id, upload__user=request.user)
     if version.status != "FAIL":
         return redirect("model_versions", model_id=version.upload.id)
     return render(request, "note2webapp/validation_failed.html", {"version": version})
@@ -172,6 +271,25 @@ def validation_failed(request, version_id):
 # ---------------------------------------------------------
 # UPLOADER DASHBOARD
 # ---------------------------------------------------------
+def _version_counts(versions):
+    """
+    Version counts tallied from a model's already-fetched versions.
+    Keys: total, active, available, failed, deleted.
+    """
+    counts = dict.fromkeys(("total", "active", "available", "failed", "deleted"), 0)
+    for version in versions:
+        counts["total"] += 1
+        if version.is_deleted:
+            counts["deleted"] += 1
+        elif version.status == "PASS":
+            counts["available"] += 1
+            if version.is_active:
+                counts["active"] += 1
+        elif version.status == "FAIL":
+            counts["failed"] += 1
+    return counts
+
+
 @login_required
 def model_uploader_dashboard(request):
     """
@@ -184,13 +302,20 @@ def model_uploader_dashboard(request):
     page = request.GET.get("page", "list")
     pk = request.GET.get("pk")
 
-    uploads = ModelUpload.objects.filter(user=request.user).order_by("-created_at")
-    for upload in uploads:
-        upload.active_versions_count = upload.versions.filter(
-            is_deleted=False, status="PASS"
-        ).count()
+    context = {"page": page}
 
-    context = {"uploads": uploads, "page": page}
+    # only the list page shows the user's models
+    if page == "list":
+        context["uploads"] = (
+            ModelUpload.objects.filter(user=request.user)
+            .annotate(
+                active_versions_count=Count(
+                    "versions",
+                    filter=Q(versions__is_deleted=False, versions__status="PASS"),
+                )
+            )
+            .order_by("-created_at")
+        )
 
     # 1) CREATE MODEL (no notifications here)
     if page == "create":
@@ -221,19 +346,9 @@ def model_uploader_dashboard(request):
     # 2) MODEL DETAIL
     elif page == "detail" and pk:
         upload = get_object_or_404(ModelUpload, pk=pk, user=request.user)
-        versions = upload.versions.all().order_by("-created_at")
-        version_counts = {
-            "total": versions.count(),
-            "active": versions.filter(
-                is_active=True, is_deleted=False, status="PASS"
-            ).count(),
-            "available": versions.filter(is_deleted=False, status="PASS").count(),
-            "failed": versions.filter(is_deleted=False, status="FAIL").count(),
-            "deleted": versions.filter(is_deleted=True).count(),
-        }
-        context.update(
-            {"upload": upload, "versions": versions, "version_counts": version_counts}
-        )
+        # the detail list shows the log but not the (possibly long) information
+        versions = upload.versions.defer("information").order_by("-created_at")
+        context.update({"upload": upload, "versions": versions})
 
     # 3) ADD VERSION (no notifications here either)
     elif page == "add_version" and pk:
@@ -283,30 +398,16 @@ def model_uploader_dashboard(request):
                     request.FILES["schema_file"]
                 )
 
-                # 2. Compare to every non-deleted version's stored files
-                duplicate_found = False
-                for v in ModelVersion.objects.filter(is_deleted=False):
-                    try:
-                        if (
-                            v.model_file
-                            and v.predict_file
-                            and v.schema_file
-                            and os.path.isfile(v.model_file.path)
-                            and os.path.isfile(v.predict_file.path)
-                            and os.path.isfile(v.schema_file.path)
-                        ):
-                            if (
-                                sha256_file_path(v.model_file.path)
-                                == incoming_model_hash
-                                and sha256_file_path(v.predict_file.path)
-                                == incoming_predict_hash
-                                and sha256_file_path(v.schema_file.path)
-                                == incoming_schema_hash
-                            ):
-                                duplicate_found = True
-                                break
-                    except Exception:
-                        continue
+                incoming_bundle_hash = bundle_sha256(
+                    incoming_model_hash, incoming_predict_hash, incoming_schema_hash
+                )
+
+                # 2. Compare to this user's non-deleted versions' stored hashes
+                duplicate_found = ModelVersion.objects.filter(
+                    upload__user=request.user,
+                    is_deleted=False,
+                    bundle_hash=incoming_bundle_hash,
+                ).exists()
 
                 if duplicate_found:
                     msg_text = (
@@ -326,7 +427,8 @@ def model_uploader_dashboard(request):
                 # 3. Create or retry the version
                 if retry_version_id:
                     try:
-                        version = ModelVersion.objects.get(
+                        # log and information are overwritten below anyway
+                        version = ModelVersion.objects.defer("log", "information").get(
                             id=retry_version_id,
                             upload=upload,
                             status="FAIL",
@@ -339,6 +441,10 @@ def model_uploader_dashboard(request):
                         version.information = form.cleaned_data["information"]
                         version.status = "PENDING"
                         version.log = ""
+                        version.model_hash = incoming_model_hash
+                        version.predict_hash = incoming_predict_hash
+                        version.schema_hash = incoming_schema_hash
+                        version.bundle_hash = incoming_bundle_hash
                         version.save()
                         messages.info(
                             request, f"Retrying upload for version '{version.tag}'"
@@ -349,9 +455,26 @@ def model_uploader_dashboard(request):
                 else:
                     version = form.save(commit=False)
                     version.upload = upload
+                    version.model_hash = incoming_model_hash
+                    version.predict_hash = incoming_predict_hash
+                    version.schema_hash = incoming_schema_hash
+                    version.bundle_hash = incoming_bundle_hash
                     version.save()
 
                 # 4. validate
+                if settings.VALIDATE_IN_BACKGROUND:
+                    # start once the new row is committed; the detail page
+                    # shows it as PENDING until the worker is done
+                    transaction.on_commit(
+                        partial(validate_model_in_background, version.id)
+                    )
+                    messages.info(
+                        request,
+                        f"Version '{version.tag}' is being validated. "
+                        "Its status will update when validation finishes.",
+                    )
+                    return redirect(f"/dashboard/?page=detail&pk={upload.pk}")
+
                 validate_model(version)
 
                 if version.status == "FAIL":
@@ -370,7 +493,8 @@ def model_uploader_dashboard(request):
             initial = {}
             if retry_version_id:
                 try:
-                    retry_version = ModelVersion.objects.get(
+                    # only tag and category pre-fill the form
+                    retry_version = ModelVersion.objects.only("tag", "category").get(
                         id=retry_version_id,
                         upload=upload,
                         status="FAIL",
@@ -400,6 +524,9 @@ def model_uploader_dashboard(request):
 # ---------------------------------------------------------
 # REVIEWER DASHBOARD
 # ---------------------------------------------------------
+REVIEWER_PAGE_SIZE = 25
+
+
 @role_required("reviewer")
 def reviewer_dashboard(request):
     page = request.GET.get("page", "list")
@@ -414,28 +541,32 @@ def reviewer_dashboard(request):
                 versions__is_deleted=False,
             )
             .distinct()
+            # the list rows only show the name and link to the detail page
+            .only("id", "name", "created_at")
             .order_by("-created_at")
         )
-        for upload in uploads:
-            upload.active_version = upload.versions.filter(
-                is_active=True, status="PASS", is_deleted=False
-            ).first()
-        context["uploads"] = uploads
+        page_obj = Paginator(uploads, REVIEWER_PAGE_SIZE).get_page(request.GET.get("p"))
+        context.update({"uploads": page_obj, "page_obj": page_obj})
         return render(request, "note2webapp/reviewer.html", context)
 
     if page == "detail" and pk:
-        upload = get_object_or_404(ModelUpload, pk=pk)
-        active_version = upload.versions.filter(
-            is_active=True, status="PASS", is_deleted=False
-        ).first()
+        # the active version comes with its upload, so the usual case is one query
+        active_version = (
+            ModelVersion.objects.select_related("upload")
+            .filter(upload_id=pk, is_active=True, status="PASS", is_deleted=False)
+            .first()
+        )
         if not active_version:
+            get_object_or_404(ModelUpload, pk=pk)
             messages.warning(request, "This model has no active version.")
             return redirect("/reviewer/?page=list")
-        context.update({"upload": upload, "active_version": active_version})
+        context.update(
+            {"upload": active_version.upload, "active_version": active_version}
+        )
         return render(request, "note2webapp/reviewer.html", context)
 
     if page == "add_feedback" and pk:
-        version = get_object_or_404(ModelVersion, pk=pk)
+        version = _get_version(pk=pk)
         if request.method == "POST":
             comment = request.POST.get("comment", "").strip()
             if comment:
@@ -454,46 +585,46 @@ def reviewer_dashboard(request):
 # ---------------------------------------------------------
 @login_required
 def soft_delete_version(request, version_id):
-    version = get_object_or_404(ModelVersion, id=version_id)
+    # count the live siblings in the same query that fetches the version
+    version = get_object_or_404(
+        ModelVersion.objects.select_related("upload__user").annotate(
+            live_siblings=Count(
+                "upload__versions",
+                filter=Q(upload__versions__is_deleted=False)
+                & ~Q(upload__versions__id=version_id),
+            )
+        ),
+        id=version_id,
+    )
 
     # permissions
     if request.user != version.upload.user and not request.user.is_staff:
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return JsonResponse(
-                {"success": False, "error": "Permission denied"}, status=403
-            )
-        messages.error(request, "You don't have permission to delete this version.")
-        return redirect("dashboard")
+        return _fail(
+            request,
+            403,
+            "You don't have permission to delete this version.",
+            "dashboard",
+            ajax_message="Permission denied",
+        )
 
     # if it's active and there are other versions -> block
-    if version.is_active:
-        other_versions = ModelVersion.objects.filter(
-            upload=version.upload, is_deleted=False
-        ).exclude(id=version_id)
-        if other_versions.exists():
-            if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-                return JsonResponse(
-                    {
-                        "success": False,
-                        "error": "Cannot delete active version. Please activate another version first.",
-                    },
-                    status=400,
-                )
-            messages.error(
-                request,
-                "Cannot delete active version. Please activate another version first.",
-            )
-            return redirect("dashboard")
+    if version.is_active and version.live_siblings:
+        return _fail(
+            request,
+            400,
+            "Cannot delete active version. Please activate another version first.",
+            "dashboard",
+        )
 
     if request.method == "POST":
         # soft-delete flags
         version.is_deleted = True
         version.deleted_at = timezone.now()
         version.is_active = False
-        version.save()
+        version.save(update_fields=["is_deleted", "deleted_at", "is_active"])
 
-        # physically remove files + folder
-        delete_version_files_and_dir(version)
+        # physically remove files + folder (off the request thread)
+        delete_version_files_and_dir(version, background=True)
 
         # 🔔 NOTIFICATIONS: let reviewers (and possibly the uploader) know
         try:
@@ -522,11 +653,11 @@ def soft_delete_version(request, version_id):
                         for r in receivers
                     ]
                 )
-        except Exception as e:
+        except Exception:
             # Don't block delete if notifications fail
-            print("Error creating delete-version notification:", e)
+            logger.exception("Error creating delete-version notification")
 
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        if _is_ajax(request):
             return JsonResponse(
                 {
                     "success": True,
@@ -548,27 +679,23 @@ def soft_delete_version(request, version_id):
 # ---------------------------------------------------------
 @login_required
 def activate_version(request, version_id):
-    version = get_object_or_404(ModelVersion, id=version_id)
+    version = _get_version(id=version_id)
     if request.user != version.upload.user and not request.user.is_staff:
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return JsonResponse(
-                {
-                    "success": False,
-                    "error": "You don't have permission to activate this version.",
-                },
-                status=403,
-            )
-        messages.error(request, "You don't have permission to activate this version.")
-        return redirect("dashboard")
+        return _fail(
+            request,
+            403,
+            "You don't have permission to activate this version.",
+            "dashboard",
+        )
 
     if version.is_deleted:
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return JsonResponse(
-                {"success": False, "error": "Cannot activate a deleted version."},
-                status=400,
-            )
-        messages.error(request, "Cannot activate a deleted version.")
-        return redirect("model_versions", model_id=version.upload.id)
+        return _fail(
+            request,
+            400,
+            "Cannot activate a deleted version.",
+            "model_versions",
+            model_id=version.upload.id,
+        )
 
     if version.status != "PASS":
         status_msg = (
@@ -576,24 +703,28 @@ def activate_version(request, version_id):
             if version.status == "PENDING"
             else "that failed validation"
         )
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return JsonResponse(
-                {
-                    "success": False,
-                    "error": f"Cannot activate a version that is {status_msg}.",
-                },
-                status=400,
-            )
-        messages.error(
+        return _fail(
             request,
+            400,
             f"Cannot activate a version that is {status_msg}. Please wait for validation to complete or upload a new version.",
+            "model_versions",
+            model_id=version.upload.id,
+            ajax_message=f"Cannot activate a version that is {status_msg}.",
         )
-        return redirect("model_versions", model_id=version.upload.id)
 
-    # deactivate all versions of this model, then activate this one
-    ModelVersion.objects.filter(upload=version.upload).update(is_active=False)
+    # activate this one and deactivate every other version of the model
+    # in a single UPDATE, so there's never a moment with two active versions;
+    # only the currently active row and this one need rewriting
+    ModelVersion.objects.filter(
+        Q(is_active=True) | Q(id=version.id), upload_id=version.upload_id
+    ).update(
+        is_active=Case(
+            When(id=version.id, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+    )
     version.is_active = True
-    version.save()
 
     # 🔔 Notify reviewers that a specific version was activated
     reviewers = User.objects.filter(profile__role="reviewer").exclude(
@@ -617,7 +748,7 @@ def activate_version(request, version_id):
             ]
         )
 
-    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+    if _is_ajax(request):
         return JsonResponse(
             {"success": True, "message": f"Version '{version.tag}' is now active."}
         )
@@ -631,28 +762,29 @@ def activate_version(request, version_id):
 
 @login_required
 def deprecate_version(request, version_id):
-    version = get_object_or_404(ModelVersion, id=version_id)
+    version = _get_version(id=version_id)
     if request.user != version.upload.user and not request.user.is_staff:
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return JsonResponse(
-                {"success": False, "error": "Permission denied"}, status=403
-            )
-        messages.error(request, "You don't have permission to deprecate this version.")
-        return redirect("dashboard")
+        return _fail(
+            request,
+            403,
+            "You don't have permission to deprecate this version.",
+            "dashboard",
+            ajax_message="Permission denied",
+        )
 
     if version.is_deleted:
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return JsonResponse(
-                {"success": False, "error": "Cannot deprecate deleted version"},
-                status=400,
-            )
-        messages.error(request, "Cannot deprecate a deleted version.")
-        return redirect("dashboard")
+        return _fail(
+            request,
+            400,
+            "Cannot deprecate a deleted version.",
+            "dashboard",
+            ajax_message="Cannot deprecate deleted version",
+        )
 
     if request.method == "POST":
         # mark version as deprecated (inactive)
         version.is_active = False
-        version.save()
+        version.save(update_fields=["is_active"])
 
         # 🔔 Notify reviewers that a specific version was deprecated
         reviewers = User.objects.filter(profile__role="reviewer").exclude(
@@ -677,7 +809,7 @@ def deprecate_version(request, version_id):
                 ]
             )
 
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        if _is_ajax(request):
             return JsonResponse(
                 {
                     "success": True,
@@ -702,36 +834,34 @@ def deprecate_version(request, version_id):
 # ---------------------------------------------------------
 @login_required
 def delete_model(request, model_id):
-    model_upload = get_object_or_404(ModelUpload, id=model_id)
+    # only count non-deleted versions
+    model_upload = get_object_or_404(
+        ModelUpload.objects.annotate(
+            remaining=Count("versions", filter=Q(versions__is_deleted=False))
+        ),
+        id=model_id,
+    )
 
     if request.user != model_upload.user and not request.user.is_staff:
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return JsonResponse(
-                {"success": False, "error": "Permission denied"}, status=403
-            )
-        messages.error(request, "You don't have permission to delete this model.")
-        return redirect("dashboard")
-
-    # only count non-deleted versions
-    remaining = ModelVersion.objects.filter(
-        upload=model_upload, is_deleted=False
-    ).count()
+        return _fail(
+            request,
+            403,
+            "You don't have permission to delete this model.",
+            "dashboard",
+            ajax_message="Permission denied",
+        )
 
+    remaining = model_upload.remaining
     if remaining > 0:
         msg = f"Cannot delete model with {remaining} active versions. Please delete all versions first."
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return JsonResponse({"success": False, "error": msg}, status=400)
-        messages.error(request, msg)
-        return redirect("dashboard")
+        return _fail(request, 400, msg, "dashboard")
 
     if request.method == "POST":
         model_name = model_upload.name
-        delete_model_media_tree(model_upload)
+        delete_model_media_tree(model_upload, background=True)
         model_upload.delete()
 
         # 🔔 Notify reviewers that this model was deleted
-        from django.urls import reverse
-
         reviewers = User.objects.filter(profile__role="reviewer")
         notif_msg = f"{request.user.username} deleted model '{model_name}'"
         notif_url = f"{reverse('reviewer_dashboard')}?page=list"
@@ -750,7 +880,7 @@ def delete_model(request, model_id):
             ]
         )
 
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        if _is_ajax(request):
             return JsonResponse(
                 {
                     "success": True,
@@ -769,18 +899,20 @@ def delete_model(request, model_id):
 @login_required
 def model_versions(request, model_id):
     model_upload = get_object_or_404(ModelUpload, pk=model_id, user=request.user)
-    versions = model_upload.versions.all().order_by("-created_at")
+    # the table shows neither the validation log nor the information text
+    versions = model_upload.versions.defer("log", "information").order_by("-created_at")
+
+    # tallied from the rows the table shows rather than a second aggregate query
+    counts = _version_counts(versions)
 
     context = {
         "model_upload": model_upload,
         "versions": versions,
-        "total_count": versions.count(),
-        "active_count": versions.filter(
-            is_active=True, is_deleted=False, status="PASS"
-        ).count(),
-        "available_count": versions.filter(is_deleted=False, status="PASS").count(),
-        "failed_count": versions.filter(is_deleted=False, status="FAIL").count(),
-        "deleted_count": versions.filter(is_deleted=True).count(),
+        "total_count": counts["total"],
+        "active_count": counts["active"],
+        "available_count": counts["available"],
+        "failed_count": counts["failed"],
+        "deleted_count": counts["deleted"],
     }
     return render(request, "note2webapp/model_versions.html", context)
 
@@ -809,7 +941,7 @@ class VersionInformationForm(forms.ModelForm):
 
 @login_required
 def edit_version_information(request, version_id):
-    version = get_object_or_404(ModelVersion, id=version_id)
+    version = _get_version(id=version_id)
     if version.upload.user != request.user:
         messages.error(request, "You don't have permission to edit this version.")
         return redirect("dashboard")
@@ -837,11 +969,12 @@ def edit_version_information(request, version_id):
 # ---------------------------------------------------------
 @login_required
 def test_model_cpu(request, version_id):
-    version = get_object_or_404(ModelVersion, id=version_id)
+    version = _get_version(id=version_id)
 
     result = None
     parse_error = None
     last_input = ""
+    busy = False
 
     if request.method == "POST":
         raw_input = request.POST.get("input_data", "").strip()
@@ -852,6 +985,9 @@ def test_model_cpu(request, version_id):
                 parsed = json.loads(raw_input)
 
                 if isinstance(parsed, list):
+                    # the valid items share one predict.py load and cwd switch
+                    items = [item for item in parsed if isinstance(item, dict)]
+                    item_results = iter(test_model_on_cpu_batch(version, items))
                     outputs = []
                     for item in parsed:
                         if not isinstance(item, dict):
@@ -862,7 +998,7 @@ def test_model_cpu(request, version_id):
                                 }
                             )
                         else:
-                            outputs.append(test_model_on_cpu(version, item))
+                            outputs.append(next(item_results))
                     result = {"status": "ok", "batch": True, "outputs": outputs}
 
                 elif isinstance(parsed, dict):
@@ -875,7 +1011,12 @@ def test_model_cpu(request, version_id):
                 # Increment usage counter every time it's tested
                 version.usage_count = models.F("usage_count") + 1
                 version.save(update_fields=["usage_count"])
-                version.refresh_from_db()
+                # only usage_count changed; don't reload the whole row
+                version.refresh_from_db(fields=["usage_count"])
+
+            except ModelRunnerBusy as e:
+                busy = True
+                parse_error = str(e)
 
             except json.JSONDecodeError as e:
                 raw_msg = str(e)
@@ -964,7 +1105,7 @@ def test_model_cpu(request, version_id):
                     reply.created_at, timezone.utc
                 ).isoformat()
 
-    return render(
+    response = render(
         request,
         "note2webapp/test_model.html",
         {
@@ -976,7 +1117,11 @@ def test_model_cpu(request, version_id):
             "is_uploader": is_uploader,
             "user_reactions": json.dumps(user_reactions),
         },
+        status=503 if busy else 200,
     )
+    if busy:
+        response["Retry-After"] = "5"
+    return response
 
 
 # ---------------------------------------------------------
@@ -996,21 +1141,32 @@ def run_model_from_path(request):
     except Exception:
         return JsonResponse({"error": "Invalid JSON in input_data"}, status=400)
 
-    spec = importlib.util.spec_from_file_location("predict_module", predict_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    module = load_predict_module(predict_path)
 
     if not hasattr(module, "predict"):
         return JsonResponse({"error": "predict() not found in predict.py"}, status=400)
 
-    sig = inspect.signature(module.predict)
-    num_params = len(sig.parameters)
+    num_params = predict_num_params(module)
     if num_params == 1:
         out = module.predict(input_data)
     else:
         out = module.predict(model_path, input_data)
 
-    return JsonResponse({"output": out})
+    return FastJsonResponse({"output": out})
+
+
+@login_required
+def version_status(request, version_id):
+    """
+    Validation status of one of the user's versions, for polling while a
+    background validation is running.
+    """
+    version = get_object_or_404(
+        ModelVersion.objects.only("id", "status"),
+        id=version_id,
+        upload__user=request.user,
+    )
+    return JsonResponse({"id": version.id, "status": version.status})
 
 
 @login_required
@@ -1026,8 +1182,13 @@ def run_model_by_version_id(request, version_id):
     except Exception:
         return JsonResponse({"error": "Invalid JSON"}, status=400)
 
-    result = test_model_on_cpu(version, input_data)
-    return JsonResponse(result)
+    try:
+        result = test_model_on_cpu(version, input_data)
+    except ModelRunnerBusy as e:
+        response = JsonResponse({"error": str(e)}, status=503)
+        response["Retry-After"] = "5"
+        return response
+    return FastJsonResponse(result)
 
 
 # ---------------------------------------------------------
@@ -1206,9 +1367,8 @@ Do NOT include headings or bullet points.
         description = completion.choices[0].message.content.strip()
         return JsonResponse({"description": description})
 
-    except Exception as e:
-        # Log error to server console for debugging
-        print("Error from OpenAI in generate_model_info:", repr(e))
+    except Exception:
+        logger.exception("Error from OpenAI in generate_model_info")
         return JsonResponse(
             {
                 "error": (
@@ -1309,7 +1469,7 @@ def model_comments_view(request, version_id):
     - Author badges and role indicators
     - Back button with return_to parameter support
     """
-    version = get_object_or_404(ModelVersion, id=version_id)
+    version = _get_version(id=version_id)
 
     comments = (
         ModelComment.objects.filter(model_version=version, parent__isnull=True)
@@ -1429,8 +1589,6 @@ def toggle_comment_reaction(request, comment_id):
 
     # 🔔 Create a notification for the comment owner when someone reacts
     if user_reaction in ("like", "dislike") and comment.user_id != request.user.id:
-        from .models import Notification
-
         # Try to link to comments page, fallback to test_model page
         try:
             url = reverse("model_comments_view", args=[comment.model_version.id])
@@ -1502,7 +1660,7 @@ def list_notifications(request):
             }
         )
 
-    return JsonResponse({"notifications": notifications_data})
+    return FastJsonResponse({"notifications": notifications_data})
 
 
 @login_required